@@ -1,5 +1,7 @@
 from typing import List, Dict
+from collections.abc import Mapping
 import random
+from strategies.history import MoveHistory, CompactMoveHistory
 
 COOPERATE = "C"
 DEFECT = "D"
@@ -18,19 +20,174 @@ PAYOFFS = {
     (ABSTAIN, DEFECT): (0, 0)
 }
 
+class SharedTrustTable(Mapping):
+    """Beta reputation per target, kept in sync by Agent.update_trust.
+
+    Holds, for every target name, the Beta expected value each observer
+    assigns it, ordered like the environment's agents, and caches the mean
+    until one of them changes. A lookup is O(1) (O(observers) after an
+    update) instead of the full rescan done by
+    Environment.calculate_shared_trust, and sums the same values in the
+    same order, so it returns exactly the same floats.
+    """
+    def __init__(self, agents=None):
+        self.values: Dict[str, Dict[str, float]] = {}
+        self.ranks: Dict[str, int] = {}
+        self.means: Dict[str, float] = {}
+        if agents is not None:
+            self.rebuild(agents)
+
+    def rebuild(self, agents):
+        """Recompute the table from scratch from the agents' evidence."""
+        self.values = {}
+        self.means = {}
+        self.ranks = {}
+        for agent in agents:
+            self.ranks.setdefault(agent.name, len(self.ranks))
+        for agent in agents:
+            for other_name, ev in agent.evidence.items():
+                self.record(agent.name, other_name, ev["success"], ev["fail"])
+
+    def record(self, observer: str, target: str, success: int, fail: int):
+        """Set observer's evidence about target to (success, fail)."""
+        val = (success + 1) / (success + fail + 2)
+        values = self.values.get(target)
+        if values is None:
+            values = self.values[target] = {}
+        if observer not in values:
+            last = next(reversed(values), None)
+            values[observer] = val
+            self.means.pop(target, None)
+            # Keep observers in agent order, the order calculate_shared_trust sums them in
+            if last is not None and self._rank(observer) < self._rank(last):
+                self.values[target] = dict(sorted(values.items(), key=lambda item: self._rank(item[0])))
+        elif values[observer] != val:
+            values[observer] = val
+            self.means.pop(target, None)
+
+    def _rank(self, observer: str) -> int:
+        # Observers outside the environment's agents sort after all of them
+        return self.ranks.get(observer, len(self.ranks))
+
+    def __getitem__(self, name: str) -> float:
+        mean = self.means.get(name)
+        if mean is None:
+            vals = self.values[name].values()
+            mean = self.means[name] = sum(vals) / len(vals)
+        return mean
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, name):
+        return name in self.values
+
+
+# P(observed action | opponent type) for the Bayesian belief update of trust_model 4
+BELIEF_LIKELIHOODS = {
+    "C": {COOPERATE: 0.8, DEFECT: 0.1, ABSTAIN: 0.1},
+    "L": {COOPERATE: 0.2, DEFECT: 0.4, ABSTAIN: 0.4},
+    "A": {COOPERATE: 0.1, DEFECT: 0.7, ABSTAIN: 0.2},
+}
+
 class Agent:
     def __init__(self, name: str, strategy_fn=None, trust_model=None, 
-                 trust=None, wealth=None, evidence=None, beliefs=None):
+                 trust=None, wealth=None, evidence=None, beliefs=None, compact=False):
         self.name = name
+        self.compact = compact  # store histories as byte arrays (CompactMoveHistory)
         self.strategy = strategy_fn  # If provided, this agent uses a fixed strategy function
         self.trust_model = trust_model  # Trust model ID (1-5) if this is a trust-based agent
         self.history = []
         self.opponent_history = []
+        self._store = None  # TrustStore holding trust/evidence/beliefs, if attached
         self.trust = trust if trust is not None else {}
         self.wealth = wealth if wealth is not None else 10  # initial wealth
         self.evidence = evidence if evidence is not None else {}  # for trust models using evidence (e.g., TRAVOS)
         self.beliefs = beliefs if beliefs is not None else {}    # for trust models using belief distributions
         self.last_action = None
+        self.reputation = None  # SharedTrustTable notified on evidence updates (set by Environment)
+
+    # Histories are MoveHistory lists (or CompactMoveHistory byte arrays in compact mode)
+    # so strategies get O(1) counts and `in` checks; assigning a plain list wraps it.
+    def _wrap_history(self, moves):
+        history_cls = CompactMoveHistory if self.compact else MoveHistory
+        return moves if isinstance(moves, history_cls) else history_cls(moves)
+
+    @property
+    def history(self):
+        return self._history
+
+    @history.setter
+    def history(self, moves):
+        self._history = self._wrap_history(moves)
+
+    @property
+    def opponent_history(self):
+        return self._opponent_history
+
+    @opponent_history.setter
+    def opponent_history(self, moves):
+        self._opponent_history = self._wrap_history(moves)
+
+    # trust, evidence and beliefs are plain dicts, or views of this agent's row of a
+    # TrustStore once attach_store is called; assigning a dict replaces the contents.
+    @property
+    def trust(self):
+        return self._trust
+
+    @trust.setter
+    def trust(self, value):
+        self._assign("_trust", value)
+
+    @property
+    def evidence(self):
+        return self._evidence
+
+    @evidence.setter
+    def evidence(self, value):
+        self._assign("_evidence", value)
+
+    @property
+    def beliefs(self):
+        return self._beliefs
+
+    @beliefs.setter
+    def beliefs(self, value):
+        self._assign("_beliefs", value)
+
+    def _assign(self, attr, value):
+        if self._store is None:
+            setattr(self, attr, value)
+            return
+        view = getattr(self, attr)
+        if value is view:
+            return
+        view.clear()
+        view.update(value)
+
+    def attach_store(self, store, index):
+        """Keep trust, evidence and beliefs in row `index` of store (a TrustStore)."""
+        from trust_store import TrustView, EvidenceView, BeliefView
+        self._store = store
+        self._store_index = index
+        self._trust = TrustView(store, index)
+        self._evidence = EvidenceView(store, index)
+        self._beliefs = BeliefView(store, index)
+
+    def detach_store(self):
+        """Copy trust, evidence and beliefs out of the attached TrustStore back into plain dicts."""
+        if self._store is None:
+            return
+        trust = dict(self._trust)
+        evidence = {name: dict(cell) for name, cell in self._evidence.items()}
+        beliefs = {name: dict(cell) for name, cell in self._beliefs.items()}
+        self._store = None
+        self.trust = trust
+        self.evidence = evidence
+        self.beliefs = beliefs
 
     def play(self):
         """For non-RL agents with a strategy function, decide an action given histories."""
@@ -50,16 +207,15 @@ class Agent:
 
     def update_beliefs(self, opponent_name: str, action: str):
         """Bayesian update of opponent type beliefs (used in trust_model 4)."""
+        if self._store is not None:
+            self._store.update_beliefs(self._store_index, opponent_name, action)
+            return
         if opponent_name not in self.beliefs:
             # Belief distribution over opponent being Cooperative (C), Liar (L), or Adversary (A)
             self.beliefs[opponent_name] = {"C": 1/3, "L": 1/3, "A": 1/3}
         prior = self.beliefs[opponent_name]
         # Likelihoods of observing an action given opponent type
-        likelihoods = {
-            "C": {COOPERATE: 0.8, DEFECT: 0.1, ABSTAIN: 0.1},
-            "L": {COOPERATE: 0.2, DEFECT: 0.4, ABSTAIN: 0.4},
-            "A": {COOPERATE: 0.1, DEFECT: 0.7, ABSTAIN: 0.2},
-        }
+        likelihoods = BELIEF_LIKELIHOODS
         marginal = sum(likelihoods[t][action] * prior[t] for t in prior)
         new_belief = {
             t: (likelihoods[t][action] * prior[t]) / marginal for t in prior
@@ -68,14 +224,21 @@ class Agent:
 
     def update_trust(self, opponent_name: str, action: str):
         """Update trust and evidence based on opponent's observed action."""
+        if self._store is not None:
+            self._store.update_trust(self._store_index, opponent_name, action, self.reputation)
+            return
         if opponent_name not in self.trust:
             self.trust[opponent_name] = 0.5  # start neutral trust
-        if opponent_name not in self.evidence:
-            self.evidence[opponent_name] = {"success": 0, "fail": 0}
+        ev = self.evidence.get(opponent_name)
+        first = ev is None
+        if first:
+            ev = self.evidence[opponent_name] = {"success": 0, "fail": 0}
         if action == COOPERATE:
-            self.evidence[opponent_name]["success"] += 1
+            ev["success"] += 1
         elif action == DEFECT:
-            self.evidence[opponent_name]["fail"] += 1
+            ev["fail"] += 1
+        if self.reputation is not None and (first or action != ABSTAIN):
+            self.reputation.record(self.name, opponent_name, ev["success"], ev["fail"])
         # Simple trust adjustment: increase trust on opponent's cooperation, decrease on defection
         if action == DEFECT:
             self.trust[opponent_name] -= 0.1
@@ -137,12 +300,55 @@ class Agent:
         else:
             return COOPERATE
 
+RECORD_POLICIES = ("interaction", "round", "end")
+
 class Environment:
-    def __init__(self, agents: List[Agent], rounds=100):
+    def __init__(self, agents: List[Agent], rounds=100, compact=False,
+                 record="interaction", record_every=1, wealth_path=None,
+                 topology=None, trust_store=False):
         self.agents = agents
         self.rounds = rounds
-        self.wealth_history = {agent.name: [] for agent in agents}
+        # Optional Topology (see topology.py): play only its pairs each round instead of
+        # the full round-robin
+        self.topology = topology
+        if topology is not None and topology.n != len(agents):
+            raise ValueError(f"topology is for {topology.n} agents, got {len(agents)}")
+        # Wealth recording policy: every `record_every` interactions, every `record_every`
+        # rounds, or only once at the end; wealth_path streams snapshots to a .npy file
+        if record not in RECORD_POLICIES:
+            raise ValueError(f"record must be one of {RECORD_POLICIES}, got {record!r}")
+        if record_every < 1:
+            raise ValueError("record_every must be >= 1")
+        self.record = record
+        self.record_every = record_every
+        self.wealth_path = wealth_path
+        self.interactions = 0
+        # Compact mode: byte-array move histories and an int32 wealth matrix instead of lists
+        self.compact = compact
+        if compact:
+            for agent in agents:
+                agent.compact = True
+                agent.history = list(agent.history)
+                agent.opponent_history = list(agent.opponent_history)
+        self.wealth_history = self._new_wealth_history(0)
         self.match_scores: Dict[(str, str), float] = {}
+        # trust_store=True keeps every agent's trust, evidence and beliefs in one TrustStore;
+        # otherwise agents still attached to an earlier environment's store go back to dicts
+        self.trust_store = None
+        if trust_store:
+            from trust_store import TrustStore
+            self.trust_store = TrustStore.attach(agents)
+        else:
+            for agent in agents:
+                agent.detach_store()
+        self.reputation = SharedTrustTable()
+        self.attach_reputation()
+
+    def attach_reputation(self):
+        """Point every agent's evidence updates at this environment's reputation table."""
+        for agent in self.agents:
+            agent.reputation = self.reputation
+        self.reputation.rebuild(self.agents)
 
     def reset(self):
         """Reset environment before a tournament."""
@@ -185,20 +391,110 @@ class Environment:
         for agent in self.agents:
             agent.wealth = 0
             agent.history = []
-        self.wealth_history = {agent.name: [] for agent in self.agents}
-        for _ in range(self.rounds):
-            for i, agent1 in enumerate(self.agents):
-                for j, agent2 in enumerate(self.agents):
-                    if i >= j:
-                        continue
-                    self.play_round(agent1, agent2)
-                    # Record wealth after each interaction
-                    for agent in self.agents:
-                        self.wealth_history[agent.name].append(agent.wealth)
+        self.attach_reputation()
+        n = len(self.agents)
+        try:
+            if self.topology is not None:
+                self._run_topology()
+                return
+            self.wealth_history = self._new_wealth_history(self.expected_records(n * (n - 1) // 2))
+            for round_index in range(self.rounds):
+                for i, agent1 in enumerate(self.agents):
+                    for j, agent2 in enumerate(self.agents):
+                        if i >= j:
+                            continue
+                        self.play_round(agent1, agent2)
+                        self.after_interaction()
+                self.after_round(round_index)
+            self.finish_recording()
+        finally:
+            self.close_wealth_stream()
+
+    def _run_topology(self):
+        """Play each round over the topology's edges only.
+
+        Per-round cost is proportional to the number of edges, so sparse
+        topologies scale with the population. With many agents, prefer the
+        "round" or "end" recording policy: each snapshot copies every
+        agent's wealth.
+        """
+        agents = self.agents
+        self.wealth_history = self._new_wealth_history(self.expected_records(self.topology.pairs_per_round))
+        for round_index in range(self.rounds):
+            for i, j in self.topology.pairs(round_index):
+                self.play_round(agents[i], agents[j])
+                self.after_interaction()
+            self.after_round(round_index)
+        self.finish_recording()
+
+    def expected_records(self, interactions_per_round):
+        """Number of wealth snapshots the recording policy takes over a run."""
+        if self.record == "interaction":
+            return self.rounds * interactions_per_round // self.record_every
+        if self.record == "round":
+            return self.rounds // self.record_every
+        return 1
+
+    def _new_wealth_history(self, records):
+        """Empty wealth history: lists per agent, a preallocated WealthHistory in compact
+        mode, or an NpyWealthWriter streaming to wealth_path."""
+        self.interactions = 0
+        self.close_wealth_stream()
+        names = [agent.name for agent in self.agents]
+        if self.wealth_path is None and not self.compact:
+            return {name: [] for name in names}
+        # NumPy only loads for the array-backed histories
+        from wealth_history import WealthHistory, NpyWealthWriter
+        if self.wealth_path is not None:
+            return NpyWealthWriter(self.wealth_path, names)
+        return WealthHistory(names, records)
+
+    def after_interaction(self):
+        """Count an interaction and record wealth if the policy asks for it."""
+        self.interactions += 1
+        if self.record == "interaction" and self.interactions % self.record_every == 0:
+            self.record_wealth()
+
+    def after_round(self, round_index, offsets=None):
+        if self.record == "round" and (round_index + 1) % self.record_every == 0:
+            self.record_wealth(offsets)
+
+    def finish_recording(self, offsets=None):
+        """Take the final snapshot under the "end" policy and close any on-disk stream."""
+        if self.record == "end":
+            self.record_wealth(offsets)
+        if self.wealth_path is not None and not isinstance(self.wealth_history, dict):
+            from wealth_history import load_wealth_history
+            self.close_wealth_stream()
+            self.wealth_history = load_wealth_history(self.wealth_path)
+
+    def close_wealth_stream(self):
+        """Close the NpyWealthWriter of a run that has not finished, if any.
+
+        Called when a run ends, even with an exception, and before a new
+        stream replaces it, so no file handle is left open.
+        """
+        if self.wealth_path is None:
+            return
+        from wealth_history import NpyWealthWriter
+        stream = getattr(self, "wealth_history", None)
+        if isinstance(stream, NpyWealthWriter):
+            stream.close()
+
+    def record_wealth(self, offsets=None):
+        """Append every agent's current wealth (plus optional per-agent offsets) to wealth_history."""
+        wealth = [agent.wealth for agent in self.agents]
+        if offsets is not None:
+            wealth = [w + int(o) for w, o in zip(wealth, offsets)]
+        if isinstance(self.wealth_history, dict):
+            for agent, w in zip(self.agents, wealth):
+                self.wealth_history[agent.name].append(w)
+        else:
+            self.wealth_history.append_row(wealth)
 
     def play_round(self, agent1: Agent, agent2: Agent):
-        """Play a single simultaneous round between two agents."""
-        shared_trust = self.calculate_shared_trust()
+        """Play a single simultaneous round between two agents and return their actions."""
+        shared_trust = self.reputation
         action1 = agent1.decide_action(agent2, shared_trust)
         action2 = agent2.decide_action(agent1, shared_trust)
         payoff1, payoff2 = PAYOFFS[(action1, action2)]
@@ -220,9 +516,14 @@ class Environment:
         if action2 != ABSTAIN:
             agent2.update_trust(agent1.name, action1)
             agent2.update_beliefs(agent1.name, action1)
+        return action1, action2
 
     def calculate_shared_trust(self) -> Dict[str, float]:
-        """Compute shared trust (reputation) values for each known agent from all agents' perspectives."""
+        """Compute shared trust (reputation) values for each known agent from all agents' perspectives.
+
+        Full O(N^2) rescan; play_round reads the incrementally maintained
+        self.reputation instead, which holds the same values.
+        """
         trust_scores: Dict[str, List[float]] = {}
         for agent in self.agents:
             for other_name, ev in agent.evidence.items():
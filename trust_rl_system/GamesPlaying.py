@@ -1,3 +1,4 @@
+import argparse
 from GameSetup import Agent, Environment
 from strategies import (
     deterministic_strategies,
@@ -7,11 +8,30 @@ from strategies import (
     evolutionary_strategies,
     group_aware_strategies,
 )
-from strategies.utility import plot_wealth_over_time
-
-import matplotlib.pyplot as plt
+from strategies.utility import plot_wealth_over_time, use_headless, PlotWorker
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trust agents vs every strategy category")
+    parser.add_argument("--headless", action="store_true",
+                        help="save wealth plots to results/ from a background process instead of showing them")
+    parser.add_argument("--max-points", type=int, default=2000,
+                        help="points per wealth trajectory in headless plots (min/max decimation)")
+    parser.add_argument("--profile", default=None, metavar="PREFIX",
+                        help="instrument the tournaments; print a phase summary and write PREFIX.trace.json/.pstats")
+    args = parser.parse_args()
+    if args.profile:
+        from profiling import Instrumentation
+        profile = Instrumentation().install()
+    if args.headless:
+        use_headless()
+        plots = PlotWorker(max_points=args.max_points)
+
+    def show_wealth(env, label):
+        if args.headless:
+            plots.wealth_over_time(env.wealth_history, f"results/wealth_{label}.png")
+        else:
+            plot_wealth_over_time(env.wealth_history)
+
     trust_agents = [
         Agent("PersonalTrust", trust_model=1),
         Agent("TRAVOSTrust", trust_model=2),
@@ -42,17 +62,23 @@ if __name__ == "__main__":
         env = Environment(agents, rounds=25)
         env.run()
 
-        plot_wealth_over_time(env.wealth_history)
+        show_wealth(env, category_name)
 
         print(env.results())
-        
-# Final run with all strategies vs trust agents
-print("\n--- Running Final Test: All Strategies vs Trust Agents ---")
-final_strategy_agents = [Agent(name=strat.__name__, strategy_fn=strat) for strat in strategy_all_agents]
-final_agents = trust_agents + final_strategy_agents
-
-env = Environment(final_agents, rounds=25)
-env.run()
-plot_wealth_over_time(env.wealth_history)
-print(env.results())
+
+    # Final run with all strategies vs trust agents
+    print("\n--- Running Final Test: All Strategies vs Trust Agents ---")
+    final_strategy_agents = [Agent(name=strat.__name__, strategy_fn=strat) for strat in strategy_all_agents]
+    final_agents = trust_agents + final_strategy_agents
+
+    env = Environment(final_agents, rounds=25)
+    env.run()
+    show_wealth(env, "All")
+    print(env.results())
+    if args.profile:
+        profile.uninstall()
+        profile.dump(args.profile)
+    if args.headless:
+        plots.close()
+        print("Saved wealth plots to results/")
 
@@ -1,7 +1,9 @@
-import math, random
+import math, random, time
 from typing import List, Tuple
 # Reuse action constants and payoff matrix
 from GameSetup import COOPERATE, DEFECT, ABSTAIN, PAYOFFS
+from strategies.registry import is_deterministic
+from transposition import TranspositionTable, shared_table, history_key
 
 class UCTNode:
     """Node in the MCTS tree."""
@@ -44,27 +46,183 @@ class UCTNode:
 
 
 class MCTS:
-    """Base Monte Carlo Tree Search."""
-    def __init__(self, action_space, simulations=100, max_depth=5, exploration_constant=1.41):
+    """Base Monte Carlo Tree Search.
+
+    With reuse_tree=True the search tree persists between decisions: when run()
+    is called with a history that extends the previous root's history, the
+    matching descendant (our move, opponent's reply) becomes the new root and
+    keeps its visit counts and rewards. max_tree_nodes caps the size of the
+    persistent tree by pruning its deepest levels; it must leave room for the
+    root and one child per action.
+
+    transposition_table caches deterministic results per state: a
+    TranspositionTable, True for the process-wide shared_table(), or None.
+    """
+    def __init__(self, action_space, simulations=100, max_depth=5, exploration_constant=1.41,
+                 reuse_tree=False, max_tree_nodes=None, transposition_table=None):
         self.action_space = action_space
         self.simulations = simulations
         self.max_depth = max_depth
         self.c = exploration_constant
+        self.reuse_tree = reuse_tree
+        if max_tree_nodes is not None and max_tree_nodes < 1 + len(action_space):
+            raise ValueError(f"max_tree_nodes must be at least {1 + len(action_space)} "
+                             f"(the root and one child per action), got {max_tree_nodes}")
+        self.max_tree_nodes = max_tree_nodes
+        self.root = None        # persistent root (reuse_tree only)
+        self.tree_size = 0
+        self.depth_offset = 0   # history length at the root; depth is counted from here when reusing
+        self.table = shared_table() if transposition_table is True else transposition_table
+        self.virtual_loss = 1.0  # loss charged to paths with a pending (batched/parallel) evaluation
 
     def run(self, root_state):
-        root = UCTNode(state=root_state)
+        root = self._prepare_root(root_state)
+        self.search(root, self.simulations)
+        return self._finish(root)  # return node, not just action
+
+    def run_anytime(self, root_state, time_budget=None, node_budget=None, max_simulations=None):
+        """Search until a wall-clock budget (seconds) and/or a tree-size budget is used up.
+
+        Returns (best root child, stats). stats has the number of
+        simulations, the tree size, whether the tree is fully expanded and
+        the time spent in selection, rollout and backpropagation. At least
+        one simulation always runs.
+
+        UCT may never revisit an unexpanded branch, so a node budget alone
+        is not guaranteed to be reached: node_budget needs a time_budget or
+        max_simulations as well. It also counts as used up once the tree is
+        complete (every action expanded down to max_depth).
+        """
+        if time_budget is None and node_budget is None and max_simulations is None:
+            raise ValueError("run_anytime needs a time_budget, node_budget or max_simulations")
+        if node_budget is not None and time_budget is None and max_simulations is None:
+            raise ValueError("node_budget needs a time_budget or max_simulations to bound the search")
+        start = time.perf_counter()
+        deadline = start + time_budget if time_budget is not None else math.inf
+        stats = {"simulations": 0, "select_time": 0.0, "rollout_time": 0.0, "backprop_time": 0.0}
+        root = self._prepare_root(root_state)
+        if node_budget is not None:
+            node_budget = min(node_budget, self.complete_tree_size(root))
+        while True:
+            stats["simulations"] += self.timed_step(root, stats)
+            if (time.perf_counter() >= deadline
+                    or (node_budget is not None and self.tree_size >= node_budget)
+                    or (max_simulations is not None and stats["simulations"] >= max_simulations)):
+                break
+        stats["tree_size"] = self.tree_size
+        stats["fully_expanded"] = self.tree_size >= self.complete_tree_size(root)
+        stats["elapsed"] = time.perf_counter() - start
+        return self._finish(root), stats
+
+    def complete_tree_size(self, root: UCTNode) -> int:
+        """Number of nodes in root's subtree once every action is expanded down to max_depth."""
+        depth = len(root.state[2]) - self.depth_offset if len(root.state) == 3 else 0
+        levels = max(0, self.max_depth - depth)
+        k = len(self.action_space)
+        return levels + 1 if k == 1 else (k ** (levels + 1) - 1) // (k - 1)
+
+    def timed_step(self, root: UCTNode, stats) -> int:
+        """One simulation with per-phase timers added to stats; returns the number of simulations run."""
+        t0 = time.perf_counter()
+        node = self.tree_policy(root)
+        t1 = time.perf_counter()
+        reward = self.rollout(node.state)
+        t2 = time.perf_counter()
+        node.backpropagate(reward)
+        t3 = time.perf_counter()
+        stats["select_time"] += t1 - t0
+        stats["rollout_time"] += t2 - t1
+        stats["backprop_time"] += t3 - t2
+        return 1
 
-        for _ in range(self.simulations):
+    def _prepare_root(self, root_state) -> UCTNode:
+        root = self._reuse_root(root_state) if self.reuse_tree else None
+        if root is None:
+            root = UCTNode(state=root_state)
+            self.tree_size = 1
+        if self.reuse_tree:
+            self.root = root
+            self.depth_offset = len(root_state[2]) if len(root_state) == 3 else 0
+        return root
+
+    def _finish(self, root: UCTNode):
+        # Choose the child with the most visits (robust child)
+        if not root.children:
+            # Fallback: no children (no simulations ran); expand a random action
+            best = self.expand_node(root)
+        else:
+            best = max(root.children, key=lambda c: c.visits)
+        # Prune after choosing: the root's children always survive (see __init__)
+        if self.reuse_tree and self.max_tree_nodes is not None and self.tree_size > self.max_tree_nodes:
+            self.prune(self.max_tree_nodes)
+        return best
+
+    def search(self, root: UCTNode, simulations: int):
+        """Run `simulations` select/rollout/backpropagate iterations from root."""
+        for _ in range(simulations):
             node = self.tree_policy(root)
             reward = self.rollout(node.state)
             node.backpropagate(reward)
 
-        # Choose the child with the most visits (robust child)
-        if not root.children:
-            # Fallback: no children (shouldn't happen, but be safe)
-            return random.choice(self.action_space)
-        best = max(root.children, key=lambda c: c.visits)
-        return best  # return node, not just action
+    def _apply_virtual_loss(self, node: UCTNode, sign: int):
+        """Count a pending evaluation as a visit with a loss on node and its ancestors (sign=-1 undoes it)."""
+        while node is not None:
+            node.visits += sign
+            node.total_reward -= sign * self.virtual_loss
+            node = node.parent
+
+    def _reuse_root(self, root_state):
+        """Descend the persistent tree along the moves played since its root.
+
+        Returns the node whose history equals root_state's, detached from its
+        parent, or None if the tree is missing or the real moves left it.
+        """
+        if self.root is None or len(root_state) != 3:
+            return None
+        old_agent1, old_agent2, old_history = self.root.state
+        agent1, agent2, history = root_state
+        if (agent1, agent2) != (old_agent1, old_agent2) or list(history[:len(old_history)]) != list(old_history):
+            return None
+        node = self.root
+        for step in history[len(old_history):]:
+            node = next((child for child in node.children if child.state[2][-1] == tuple(step)), None)
+            if node is None:
+                return None
+        if node is not self.root:
+            node.parent = None
+            self.tree_size = self.count_nodes(node)
+        return node
+
+    def advance(self, action, opponent_action):
+        """Re-root the persistent tree after a real round (our action, opponent's reply)."""
+        if self.root is None:
+            return
+        agent1, agent2, history = self.root.state
+        self.root = self._reuse_root((agent1, agent2, list(history) + [(action, opponent_action)]))
+        if self.root is not None:
+            self.depth_offset = len(self.root.state[2])
+
+    @staticmethod
+    def count_nodes(root: UCTNode) -> int:
+        count, stack = 0, [root]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children)
+        return count
+
+    def prune(self, max_nodes):
+        """Drop the deepest levels of the persistent tree until it has at most max_nodes nodes."""
+        level, kept = [self.root], 0
+        while level and kept + len(level) <= max_nodes:
+            kept += len(level)
+            next_level = [child for node in level for child in node.children]
+            if kept + len(next_level) > max_nodes:
+                for node in level:
+                    node.children = []
+                break
+            level = next_level
+        self.tree_size = kept
 
     def tree_policy(self, node: UCTNode) -> UCTNode:
         while not self._is_terminal(node.state):
@@ -78,6 +236,7 @@ class MCTS:
         untried = node.get_untried_actions(self.action_space)
         action = random.choice(untried)  # <- randomness to avoid "always C"
         next_state = self.simulate_transition(node.state, action)
+        self.tree_size += 1
         return node.expand(action, next_state)
 
     def rollout(self, state) -> float:
@@ -85,7 +244,7 @@ class MCTS:
         agent1, agent2, history = state
         # do a very short random rollout to max_depth
         sim_hist = list(history)
-        for _ in range(self.max_depth - len(sim_hist)):
+        for _ in range(self.max_depth - (len(sim_hist) - self.depth_offset)):
             a1 = random.choice(self.action_space)
             a2 = random.choice(self.action_space)
             sim_hist.append((a1, a2))
@@ -106,9 +265,16 @@ class MCTS:
 
         # Agent2 responds (if fixed strategy -> use it, else simple trust-based heuristic)
         if hasattr(agent2, 'strategy') and agent2.strategy is not None:
-            self_hist = [b for (_, b) in new_history]
-            opp_hist = [a for (a, _) in new_history]
-            agent2_move = agent2.strategy(self_hist, opp_hist)
+            # A deterministic strategy's reply depends only on the history so far
+            cacheable = self.table is not None and is_deterministic(agent2.strategy)
+            key = ("reply", agent2.strategy, history_key(new_history)) if cacheable else None
+            agent2_move = self.table.get(key) if cacheable else None
+            if agent2_move is None:
+                self_hist = [b for (_, b) in new_history]
+                opp_hist = [a for (a, _) in new_history]
+                agent2_move = agent2.strategy(self_hist, opp_hist)
+                if cacheable:
+                    self.table.put(key, agent2_move)
         elif hasattr(agent2, 'trust_model') and agent2.trust_model is not None:
             trust_level = agent2.trust.get(agent1.name, 0.5)
             if trust_level < 0.3:
@@ -129,7 +295,7 @@ class MCTS:
             # No history -> not terminal but we can't go depth-wise: treat as start
             return False
         _, _, history = state
-        return len(history) >= self.max_depth
+        return len(history) - self.depth_offset >= self.max_depth
     
     def run_simulation(self, player, opponent):
         """
@@ -141,32 +307,138 @@ class MCTS:
 
 
 class MCTSWithLearningModel(MCTS):
-    """MCTS that uses a learned model (Trust GNN) to evaluate rollouts."""
+    """MCTS that uses a learned model (Trust GNN) to evaluate rollouts.
+
+    With leaf_batch_size=K > 1, each search step selects K leaves (a virtual
+    loss on every selected path steers the later selections elsewhere), scores
+    all K graphs in one batched GNN forward pass and then backpropagates them.
+
+    dense_scorer (a dense_gnn scorer) scores leaves from their (2, 5)
+    feature matrices directly, instead of building graphs for gnn_model.
+    """
     def __init__(self, action_space, simulations=50, max_depth=5,
                  env_model=None, gnn_model=None, build_graph_fn=None, trust_model=None,
-                 exploration_constant=1.41):
-        super().__init__(action_space, simulations, max_depth, exploration_constant)
+                 exploration_constant=1.41, reuse_tree=False, max_tree_nodes=None,
+                 leaf_batch_size=1, virtual_loss=1.0, transposition_table=None, dense_scorer=None):
+        super().__init__(action_space, simulations, max_depth, exploration_constant,
+                         reuse_tree, max_tree_nodes, transposition_table)
         self.gnn_model = gnn_model      # Pretrained GNN to estimate trust/value
         self.build_graph_fn = build_graph_fn
+        self.dense_scorer = dense_scorer
+        self.leaf_batch_size = leaf_batch_size
+        self.virtual_loss = virtual_loss
+
+    EDGES = [(0, 1), (1, 0)]
+
+    def leaf_features(self, state):
+        """Node features of the 2-agent trust graph the GNN scores for a leaf state."""
+        agent1, agent2 = state[0], state[1]
+        return [
+            [agent1.trust.get(agent2.name, 0.5), agent1.wealth, 0.0, 0.0, 0.0],
+            [agent2.trust.get(agent1.name, 0.5), agent2.wealth, 0.0, 0.0, 0.0]
+        ]
+
+    def score_key(self, features):
+        """Transposition key of a GNN score: the leaf features fully determine it."""
+        model = self.gnn_model if self.dense_scorer is None else self.dense_scorer
+        return ("gnn", model, tuple(v for row in features for v in row))
 
     def rollout(self, state):
         # Use the learned model to score the leaf state
-        agent1, agent2, history = state if len(state) == 3 else (*state, [])
         try:
-            features = [
-                [agent1.trust.get(agent2.name, 0.5), agent1.wealth, 0.0, 0.0, 0.0],
-                [agent2.trust.get(agent1.name, 0.5), agent2.wealth, 0.0, 0.0, 0.0]
-            ]
-            edges = [(0, 1), (1, 0)]
-            graph = self.build_graph_fn(features, edges)
-            pred = self.gnn_model(graph).squeeze()
-            return float(pred.mean().item())
+            features = self.leaf_features(state)
+            key = self.score_key(features) if self.table is not None else None
+            value = self.table.get(key) if key is not None else None
+            if value is not None:
+                return value
+            if self.dense_scorer is not None:
+                value = self.dense_scorer.values([features])[0]
+            else:
+                graph = self.build_graph_fn(features, self.EDGES)
+                pred = self.gnn_model(graph).squeeze()
+                value = float(pred.mean().item())
+            if key is not None:
+                self.table.put(key, value)
+            return value
         except Exception as e:
             # Fallback if the GNN errors out
             return super().rollout(state)
 
+    def evaluate_leaves(self, states):
+        """Score many leaf states with one GNN forward pass over a batched graph."""
+        try:
+            features = [self.leaf_features(state) for state in states]
+            keys = [self.score_key(f) for f in features] if self.table is not None else [None] * len(states)
+            values = [self.table.get(key) if key is not None else None for key in keys]
+            pending = [i for i, value in enumerate(values) if value is None]
+            if pending:
+                if self.dense_scorer is not None:
+                    scores = self.dense_scorer.values([features[i] for i in pending])
+                else:
+                    import torch
+                    from torch_geometric.data import Batch
+                    from torch_geometric.nn import global_mean_pool
+                    batch = Batch.from_data_list([self.build_graph_fn(features[i], self.EDGES) for i in pending])
+                    with torch.inference_mode():
+                        out = self.gnn_model(batch)
+                        # Same as pred.mean() per graph: mean over its nodes, then over outputs
+                        scores = global_mean_pool(out, batch.batch).mean(dim=1).tolist()
+                for i, score in zip(pending, scores):
+                    values[i] = score
+                    if keys[i] is not None:
+                        self.table.put(keys[i], score)
+            return values
+        except Exception as e:
+            return [self.rollout(state) for state in states]
+
+    def search(self, root: UCTNode, simulations: int):
+        if self.leaf_batch_size <= 1:
+            return super().search(root, simulations)
+        done = 0
+        while done < simulations:
+            done += self._batch_step(root, min(self.leaf_batch_size, simulations - done))
+
+    def timed_step(self, root: UCTNode, stats) -> int:
+        if self.leaf_batch_size <= 1:
+            return super().timed_step(root, stats)
+        return self._batch_step(root, self.leaf_batch_size, stats)
+
+    def _batch_step(self, root: UCTNode, size: int, stats=None) -> int:
+        """Select `size` leaves under virtual loss, score them in one batch and backpropagate."""
+        t0 = time.perf_counter()
+        leaves = []
+        for _ in range(size):
+            leaf = self.tree_policy(root)
+            self._apply_virtual_loss(leaf, 1)
+            leaves.append(leaf)
+        t1 = time.perf_counter()
+        values = self.evaluate_leaves([leaf.state for leaf in leaves])
+        t2 = time.perf_counter()
+        for leaf, value in zip(leaves, values):
+            self._apply_virtual_loss(leaf, -1)
+            leaf.backpropagate(value)
+        if stats is not None:
+            stats["select_time"] += t1 - t0
+            stats["rollout_time"] += t2 - t1
+            stats["backprop_time"] += time.perf_counter() - t2
+        return len(leaves)
+
+    def run_simulation(self, player, opponent):
+        """Phase3Simulator's move: a model-scored search, or player's own strategy if it has one."""
+        if player.strategy is not None:
+            return super().run_simulation(player, opponent)
+        return self.select_action(player, opponent)
+
     def select_action(self, agent, opponent):
-        # Proper initial state: include empty history
-        state = (agent, opponent, [])
+        # Proper initial state: include empty history (or the real one, so a persistent tree can be re-rooted)
+        history = list(zip(agent.history, opponent.history)) if self.reuse_tree else []
+        state = (agent, opponent, history)
         selected_node = self.run(state)
         return selected_node.action
+
+    def select_action_anytime(self, agent, opponent, time_budget=None, node_budget=None, max_simulations=None):
+        """Anytime counterpart of select_action: search within a time (seconds), node and/or
+        simulation budget (see run_anytime) and return (best action so far, search stats)."""
+        history = list(zip(agent.history, opponent.history)) if self.reuse_tree else []
+        best, stats = self.run_anytime((agent, opponent, history), time_budget, node_budget, max_simulations)
+        return best.action, stats
@@ -0,0 +1,299 @@
+import math
+import random
+from array import array
+import numpy as np
+from GameSetup import COOPERATE, DEFECT, ABSTAIN, PAYOFFS
+from strategies.registry import is_deterministic
+
+
+class ArrayMCTS:
+    """MCTS over flat, preallocated node arrays instead of UCTNode objects.
+
+    Node i is described by visits[i], total_reward[i], parent[i], action[i]
+    (index into action_space), opp_action[i] (the opponent's simulated reply),
+    first_child[i], n_children[i] and depth[i]. The children of a node occupy
+    one contiguous block of len(action_space) slots reserved on its first
+    expansion, with the actions in random order, so "pick a random untried
+    action" is just "take the next slot". A node's history is recovered by
+    following parent pointers rather than copied into every node, and
+    backpropagation is a loop up the parent chain.
+
+    The arrays are typed array.array buffers (fast scalar access from the
+    search loop); node_arrays() returns zero-copy NumPy views of them.
+    The exploration term c*sqrt(ln N / n) is split into two lookup tables
+    built once per run.
+
+    Same search as MCTS (random expansion order, UCT selection, random
+    rollouts to max_depth, robust child at the root); run() returns the
+    chosen action rather than a node.
+
+    With trees > 1, run() instead grows that many independent trees in
+    lockstep, each with ceil(simulations / trees) simulations and its own
+    region of the node arrays. Each step of the search advances every tree
+    at once with NumPy: the UCT scores of all the trees' current child
+    blocks are computed in one expression, and expansions, rollouts and
+    backpropagation are batched the same way. As in RootParallelMCTS,
+    root visits are summed per action and the most visited action wins
+    (root_stats holds the merged (visits, total reward)). A single tree
+    keeps the scalar loop: on a 3-child block NumPy's per-call overhead
+    outweighs the loop it replaces.
+    """
+    def __init__(self, action_space, simulations=100, max_depth=5, exploration_constant=1.41, trees=1):
+        self.action_space = list(action_space)
+        self.simulations = simulations
+        self.trees = trees
+        self.root_stats = {}
+        self.max_depth = max_depth
+        self.c = exploration_constant
+        # Payoff to agent1 of every (a1, a2) pair: a uniform pick is one uniform random rollout step
+        self._c_sqrt_log = [0.0]   # c * sqrt(ln n), indexed by parent visits
+        self._inv_sqrt = [0.0]     # 1 / sqrt(n), indexed by child visits
+        self.pair_payoffs = [PAYOFFS[(a1, a2)][0] for a1 in self.action_space for a2 in self.action_space]
+        self.size = 0
+
+    def _allocate(self, capacity):
+        self.visits = array('q', bytes(8 * capacity))
+        self.total_reward = array('d', bytes(8 * capacity))
+        self.parent = array('i', [-1]) * capacity
+        self.action = array('b', [-1]) * capacity
+        self.opp_action = array('b', [-1]) * capacity
+        self.first_child = array('i', [-1]) * capacity
+        self.n_children = array('b', bytes(capacity))
+        self.depth = array('h', bytes(2 * capacity))
+        self.size = 1
+
+    _NODE_FIELDS = ("visits", "total_reward", "parent", "action", "opp_action",
+                    "first_child", "n_children", "depth")
+
+    def _view(self, name):
+        buffer = getattr(self, name)
+        return np.frombuffer(buffer, dtype=buffer.typecode)
+
+    def node_arrays(self):
+        """Zero-copy NumPy views of the node arrays, trimmed to the nodes in use."""
+        return {name: self._view(name)[:self.size] for name in self._NODE_FIELDS}
+
+    def run(self, root_state):
+        agent1, agent2, history = root_state if len(root_state) == 3 else (*root_state, [])
+        if self.trees > 1:
+            return self._run_lockstep(agent1, agent2, history)
+        sims, k, c = self.simulations, len(self.action_space), self.c
+        # At most one expansion per simulation, each reserving a block of k slots
+        self._allocate(1 + sims * k)
+        self.root_history = list(history)
+        self.depth[0] = len(self.root_history)
+        responder = self._responder(agent1, agent2)
+        c_sqrt_log, inv_sqrt = self._uct_tables(sims + 1)
+
+        visits, total, parent = self.visits, self.total_reward, self.parent
+        first_child, n_children, depth = self.first_child, self.n_children, self.depth
+        max_depth, pair_payoffs = self.max_depth, self.pair_payoffs
+        choices, inf = random.choices, math.inf
+        for _ in range(sims):
+            # Selection / expansion
+            node = 0
+            while depth[node] < max_depth:
+                n = n_children[node]
+                if n < k:
+                    node = self._expand(node, n, responder)
+                    break
+                first = first_child[node]
+                explore = c_sqrt_log[visits[node]]
+                best, best_score = first, -inf
+                for child in range(first, first + k):
+                    v = visits[child]
+                    score = total[child] / v + explore * inv_sqrt[v]
+                    if score > best_score:
+                        best, best_score = child, score
+                node = best
+            # Rollout
+            steps = max_depth - depth[node]
+            reward = float(sum(choices(pair_payoffs, k=steps))) if steps > 0 else 0.0
+            # Backpropagation
+            while node >= 0:
+                visits[node] += 1
+                total[node] += reward
+                node = parent[node]
+
+        if n_children[0] == 0:
+            return random.choice(self.action_space)
+        first = first_child[0]
+        best = max(range(first, first + n_children[0]), key=visits.__getitem__)
+        return self.action_space[self.action[best]]
+
+    def _run_lockstep(self, agent1, agent2, history):
+        """run() for trees > 1: every tree takes one simulation per step, vectorized across trees."""
+        trees, k, max_depth = self.trees, len(self.action_space), self.max_depth
+        per_tree = math.ceil(self.simulations / trees)
+        stride = 1 + per_tree * k  # node slots owned by each tree
+        self._allocate(trees * stride)
+        self.size = trees * stride
+        self.root_history = list(history)
+        rng = np.random.default_rng(random.getrandbits(64))
+        replies = _ReplyTable(self, agent1, agent2)
+        c_sqrt_log, inv_sqrt = (np.array(table) for table in self._uct_tables(per_tree + 1))
+        pair_payoffs = np.array(self.pair_payoffs, dtype=np.float64)
+
+        visits, total, parent, action, opp_action, first_child, n_children, depth = (
+            self._view(name) for name in self._NODE_FIELDS)
+        history_id = np.zeros(trees * stride, dtype=np.int64)
+        roots = np.arange(trees, dtype=np.int64) * stride
+        depth[roots] = len(self.root_history)
+        used = np.ones(trees, dtype=np.int64)   # slots used so far in each tree's region
+        block_offsets = np.arange(k)
+        rollout_steps = np.arange(max_depth)
+        # Every tree still descending is at the same depth, so the depth limit is a level count
+        levels = max_depth - len(self.root_history)
+
+        for _ in range(per_tree):
+            # Selection / expansion: each tree expands one node or descends to max_depth
+            node = roots.copy()
+            descending = np.arange(trees)
+            for _level in range(levels):
+                current = node[descending]
+                n = n_children[current]
+                expanding = n < k
+                if expanding.any():
+                    tree_ids, parents, n_exp = descending[expanding], current[expanding], n[expanding]
+                    fresh = n_exp == 0
+                    if fresh.any():
+                        # Reserve each node's child block, actions in random (untried) order
+                        owners = tree_ids[fresh]
+                        first = owners * stride + used[owners]
+                        used[owners] += k
+                        first_child[parents[fresh]] = first
+                        action[first[:, None] + block_offsets] = np.argsort(rng.random((len(first), k)), axis=1)
+                    child = first_child[parents] + n_exp
+                    n_children[parents] = n_exp + 1
+                    parent[child] = parents
+                    depth[child] = depth[parents] + 1
+                    opp_action[child], history_id[child] = replies(history_id[parents], action[child])
+                    node[tree_ids] = child
+                    selecting = ~expanding
+                    descending, current = descending[selecting], current[selecting]
+                    if not descending.size:
+                        break
+                # UCT over each remaining tree's contiguous child block at once
+                block = first_child[current][:, None] + block_offsets
+                v = visits[block]
+                scores = total[block] / v + c_sqrt_log[visits[current]][:, None] * inv_sqrt[v]
+                node[descending] = block[np.arange(len(block)), scores.argmax(axis=1)]
+            # Rollout: the first max_depth - depth of max_depth uniform random pair payoffs
+            steps = max_depth - depth[node]
+            draws = pair_payoffs[rng.integers(len(pair_payoffs), size=(trees, max_depth))]
+            reward = np.where(rollout_steps < steps[:, None], draws, 0.0).sum(axis=1)
+            # Backpropagation up every tree at once
+            while node.size:
+                visits[node] += 1
+                total[node] += reward
+                node = parent[node]
+                alive = node >= 0
+                node, reward = node[alive], reward[alive]
+
+        root_children = (first_child[roots][:, None] + block_offsets).ravel()
+        merged_visits = np.bincount(action[root_children], weights=visits[root_children], minlength=k)
+        merged_total = np.bincount(action[root_children], weights=total[root_children], minlength=k)
+        self.root_stats = {self.action_space[a]: (int(merged_visits[a]), float(merged_total[a])) for a in range(k)}
+        return self.action_space[int(merged_visits.argmax())]
+
+    def _uct_tables(self, max_visits):
+        """Exploration lookup tables, extended (and kept) as larger searches need them."""
+        for n in range(len(self._inv_sqrt), max_visits + 1):
+            self._c_sqrt_log.append(self.c * math.sqrt(math.log(n)))
+            self._inv_sqrt.append(1.0 / math.sqrt(n))
+        return self._c_sqrt_log, self._inv_sqrt
+
+    def _expand(self, node, n, responder):
+        k = len(self.action_space)
+        if n == 0:
+            # Reserve a block for all children, with actions in random (untried) order
+            first = self.size
+            self.size += k
+            self.first_child[node] = first
+            order = random.sample(range(k), k)
+            for slot, a in enumerate(order):
+                self.action[first + slot] = a
+        child = self.first_child[node] + n
+        self.n_children[node] = n + 1
+        self.parent[child] = node
+        self.depth[child] = self.depth[node] + 1
+        own, opp = self._history(node)
+        self.opp_action[child] = responder(own + [self.action_space[self.action[child]]], opp)
+        return child
+
+    def _history(self, node):
+        """(agent1 moves, agent2 moves) from the root history down to node."""
+        moves = []
+        while node > 0:
+            moves.append((self.action[node], self.opp_action[node]))
+            node = self.parent[node]
+        own = [a for a, _ in self.root_history]
+        opp = [b for _, b in self.root_history]
+        for a, b in reversed(moves):
+            own.append(self.action_space[a])
+            opp.append(self.action_space[b])
+        return own, opp
+
+    def _responder(self, agent1, agent2):
+        """Opponent reply (as an action index) to our histories, mirroring MCTS.simulate_transition."""
+        index = {a: i for i, a in enumerate(self.action_space)}
+        if getattr(agent2, 'strategy', None) is not None:
+            # The opponent sees the history before our current move
+            return lambda own, opp: index[agent2.strategy(opp, own[:-1])]
+        if getattr(agent2, 'trust_model', None) is not None:
+            trust_level = agent2.trust.get(agent1.name, 0.5)
+            move = ABSTAIN if trust_level < 0.3 else DEFECT if trust_level < 0.5 else COOPERATE
+            return lambda own, opp: index[move]
+        return lambda own, opp: random.randrange(len(self.action_space))
+
+    def select_action(self, agent, opponent):
+        return self.run((agent, opponent, []))
+
+
+class _ReplyTable:
+    """Opponent replies for ArrayMCTS's lockstep trees, keyed by history.
+
+    Histories are numbered as they are first reached (0 is the root
+    history). Replies that depend only on the history (deterministic
+    strategies, trust models) are kept in a (history, action) table, so
+    the trees reaching the same history share one strategy call and a
+    batch of lookups is a single gather; other opponents are asked on
+    every expansion.
+    """
+    def __init__(self, mcts, agent1, agent2):
+        self.action_space = mcts.action_space
+        self.respond = mcts._responder(agent1, agent2)
+        strategy = getattr(agent2, 'strategy', None)
+        self.cacheable = (is_deterministic(strategy) if strategy is not None
+                          else getattr(agent2, 'trust_model', None) is not None)
+        self.histories = [([a for a, _ in mcts.root_history], [b for _, b in mcts.root_history])]
+        k = len(self.action_space)
+        self.reply = np.full((64, k), -1, dtype=np.int8)
+        self.child = np.full((64, k), -1, dtype=np.int64)
+
+    def _add(self, history, a):
+        """Ask the opponent for its reply to action a after history; returns (reply, child history)."""
+        own, opp = self.histories[history]
+        own = own + [self.action_space[a]]
+        reply = self.respond(own, opp)
+        self.histories.append((own, opp + [self.action_space[reply]]))
+        return reply, len(self.histories) - 1
+
+    def __call__(self, histories, actions):
+        """(opponent replies, child history ids) for each (parent history, action) pair."""
+        if not self.cacheable:
+            pairs = [self._add(h, a) for h, a in zip(histories.tolist(), actions.tolist())]
+            replies, children = zip(*pairs)
+            return np.array(replies, dtype=np.int8), np.array(children, dtype=np.int64)
+        child = self.child[histories, actions]
+        missing = np.flatnonzero(child < 0)
+        if missing.size:
+            for h, a in zip(histories[missing].tolist(), actions[missing].tolist()):
+                if self.child[h, a] < 0:  # two trees may reach the same new history
+                    reply, new = self._add(h, a)
+                    if new >= len(self.child):
+                        self.reply = np.concatenate([self.reply, np.full_like(self.reply, -1)])
+                        self.child = np.concatenate([self.child, np.full_like(self.child, -1)])
+                    self.reply[h, a], self.child[h, a] = reply, new
+            child = self.child[histories, actions]
+        return self.reply[histories, actions], child
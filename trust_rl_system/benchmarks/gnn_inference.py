@@ -0,0 +1,78 @@
+"""Eager vs compiled (frozen TorchScript) vs dense TrustGNN inference latency.
+
+Both TrustGNN variants (Graph_Neural_Network's GCN and GAT's) score
+batches of the 2-node, 2-edge graphs MCTS evaluates, at batch sizes 1, 64
+and 1024. The batch is built once, so only the forward pass is timed, in
+one torch thread under inference_mode; the dense_gnn scorers take the same
+features as a (B, 2, 5) tensor. Outputs of all paths are checked to agree
+before timing.
+
+    python benchmarks/gnn_inference.py --json gnn_inference.json
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import torch
+
+from suite import ROOT, measure, _format
+
+BATCH_SIZES = (1, 64, 1024)
+
+
+def _batch(size, seed=0):
+    """(B, 2, 5) leaf features and the same leaves as a torch_geometric Batch."""
+    from torch_geometric.data import Batch
+    from GAT import build_trust_graph
+    generator = torch.Generator().manual_seed(seed)
+    features = torch.rand(size, 2, 5, generator=generator) * torch.tensor([1, 100, 1, 1, 1])
+    return features, Batch.from_data_list([build_trust_graph(f.tolist(), [(0, 1), (1, 0)]) for f in features])
+
+
+def run(batch_sizes=BATCH_SIZES, repeats=5):
+    from compiled_gnn import load_eager, export, load_compiled
+    from dense_gnn import DenseGCNScorer, DenseGATScorer
+    torch.set_num_threads(1)
+    weights = {"gcn": os.path.join(ROOT, "saved_models", "trust_gnn.pth"), "gat": None}
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind, path in weights.items():
+            eager = load_eager(kind, path)
+            artifact = os.path.join(tmp, f"{kind}.ts")
+            export(eager, artifact)
+            compiled = load_compiled(artifact)
+            dense = (DenseGATScorer if kind == "gat" else DenseGCNScorer).from_model(eager)
+            for size in batch_sizes:
+                features, batch = _batch(size)
+                with torch.inference_mode():
+                    expected = eager(batch)
+                    if not torch.allclose(expected, compiled(batch), atol=1e-5):
+                        raise AssertionError(f"{kind}: compiled output differs from eager at batch {size}")
+                    if not torch.allclose(expected, dense(features).reshape(-1, 2), atol=1e-5):
+                        raise AssertionError(f"{kind}: dense output differs from eager at batch {size}")
+
+                    eager_s, _ = measure(lambda: eager(batch), repeats)
+                    compiled_s, _ = measure(lambda: compiled(batch), repeats)
+                    dense_s, _ = measure(lambda: dense(features), repeats)
+                results[f"{kind}/batch_{size}"] = {"eager_s": eager_s, "compiled_s": compiled_s,
+                                                   "dense_s": dense_s, "speedup": eager_s / compiled_s,
+                                                   "dense_speedup": eager_s / dense_s}
+                print(f"{kind:<4} batch {size:>5}   eager {_format(eager_s):>10}   "
+                      f"compiled {_format(compiled_s):>10} x{eager_s / compiled_s:<5.1f}"
+                      f"dense {_format(dense_s):>10} x{eager_s / dense_s:.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Eager vs compiled vs dense TrustGNN forward latency")
+    parser.add_argument("--json", default=None, help="also write the results to this JSON file")
+    parser.add_argument("--repeats", type=int, default=5, help="timing runs per measurement")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    results = run(repeats=args.repeats)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved GNN latencies to {args.json}")
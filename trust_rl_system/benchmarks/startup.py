@@ -0,0 +1,71 @@
+"""Import-time benchmark for the trust_rl_system entry points.
+
+Each entry point is imported in a fresh interpreter (so nothing is cached
+in sys.modules) and timed; the median over --repeats runs is reported with
+the heavy dependencies that the import pulled in.
+
+    python benchmarks/startup.py --repeats 5 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("numpy", "pandas", "matplotlib", "seaborn", "torch", "torch_geometric", "sqlite3")
+
+# Scripts that run on import (GamesPlaying) are measured through their imports
+ENTRY_POINTS = {
+    "GameSetup": "import GameSetup",
+    "GamesPlaying": "import GameSetup, strategies.utility, strategies.registry",
+    "vectorized_tournament": "import vectorized_tournament",
+    "phase_3_mcts_simulation": "import phase_3_mcts_simulation",
+    "tournament_runner": "import tournament_runner",
+    "strategies.utility": "import strategies.utility",
+    "Graph_Neural_Network": "import Graph_Neural_Network",
+}
+
+_PROBE = (
+    "import time, sys, json\n"
+    "t = time.perf_counter()\n"
+    "{statement}\n"
+    "elapsed = time.perf_counter() - t\n"
+    "print(json.dumps([elapsed, [m for m in {heavy!r} if m in sys.modules]]))\n"
+)
+
+
+def time_import(statement, repeats=5):
+    """Median wall time (s) of `statement` in fresh interpreters, and the heavy modules it loaded."""
+    samples, loaded = [], []
+    code = _PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                             text=True, check=True)
+        elapsed, loaded = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(elapsed)
+    return statistics.median(samples), loaded
+
+
+def run(entry_points=ENTRY_POINTS, repeats=5):
+    results = {}
+    for name, statement in entry_points.items():
+        seconds, loaded = time_import(statement, repeats)
+        results[name] = {"import_ms": round(seconds * 1000, 2), "heavy_modules": loaded}
+        print(f"{name:<26} {seconds * 1000:9.1f} ms   {', '.join(loaded) or '-'}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import time of each trust_rl_system entry point")
+    parser.add_argument("--repeats", type=int, default=5, help="fresh interpreters per entry point")
+    parser.add_argument("--json", default=None, help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(repeats=args.repeats)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved startup timings to {args.json}")
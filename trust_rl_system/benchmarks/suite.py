@@ -0,0 +1,283 @@
+"""Micro- and macro-benchmarks for the simulation hot paths.
+
+Micro-benchmarks time single calls (Environment.play_round,
+calculate_shared_trust, Agent.update_beliefs, every strategy function at
+history lengths 10 to 100k, MCTS.run, and the eager, compiled and dense
+TrustGNN forward); macro-benchmarks time a whole run (the GamesPlaying
+all-strategies tournament and a reduced tournament_runner sweep). Each
+result is the median seconds per call over --repeats timing runs.
+
+Results are written as JSON and compared against a stored baseline; any
+benchmark slower than baseline * (1 + threshold) is reported as a
+regression and makes the script exit with status 1.
+
+    python benchmarks/suite.py --json bench.json
+    python benchmarks/suite.py --quick --filter strategy/tit_for_tat
+    python benchmarks/suite.py --save-baseline      # refresh benchmarks/baseline.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+HISTORY_LENGTHS = (10, 100, 1_000, 10_000, 100_000)
+MCTS_SIMULATIONS = (10, 100, 1_000)
+
+TRUST_MODELS = {"PersonalTrust": 1, "TRAVOSTrust": 2, "HearsayTrust": 3,
+                "DefectiveAgent": 4, "AdversaryAgent": 5}
+
+
+def measure(fn, repeats=5, min_time=0.05, warmup=2):
+    """Median seconds per call of fn().
+
+    fn is called `warmup` times untimed first (TorchScript profiles its
+    first runs before optimizing). The number of calls per timing run is
+    then doubled until a run takes at least min_time, so fast functions are
+    not swamped by timer overhead.
+    """
+    for _ in range(warmup):
+        fn()
+    number = 1
+    while True:
+        t = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t
+        if elapsed >= min_time:
+            break
+        number *= 2
+    samples = [elapsed / number]
+    for _ in range(repeats - 1):
+        t = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t) / number)
+    return statistics.median(samples), number
+
+
+def _trust_agents():
+    from GameSetup import Agent
+    return [Agent(name, trust_model=model) for name, model in TRUST_MODELS.items()]
+
+
+def _all_strategies():
+    from tournament_runner import ALL_OPPONENTS
+    return ALL_OPPONENTS
+
+
+# Each benchmark builder yields (name, fn); fn is the call being timed.
+
+def play_round_benchmarks(quick):
+    from GameSetup import Agent, Environment
+    from strategies.deterministic_strategies import tit_for_tat
+    pairs = {
+        "trust_vs_strategy": (Agent("PersonalTrust", trust_model=1), Agent("tit_for_tat", strategy_fn=tit_for_tat)),
+        "trust_vs_trust": (Agent("TRAVOSTrust", trust_model=2), Agent("HearsayTrust", trust_model=3)),
+    }
+    for label, (agent1, agent2) in pairs.items():
+        env = Environment([agent1, agent2], rounds=1)
+        yield f"micro/play_round/{label}", lambda env=env, a=agent1, b=agent2: env.play_round(a, b)
+
+
+def shared_trust_benchmarks(quick):
+    from GameSetup import Agent, Environment
+    agents = _trust_agents() + [Agent(fn.__name__, strategy_fn=fn) for fn in _all_strategies()]
+    env = Environment(agents, rounds=2)
+    random.seed(0)
+    env.run()
+    yield f"micro/calculate_shared_trust/{len(agents)}_agents", env.calculate_shared_trust
+
+
+def update_beliefs_benchmarks(quick):
+    from GameSetup import Agent
+    agent = Agent("PersonalTrust", trust_model=1)
+    actions = itertools.cycle("CDA")
+    yield "micro/update_beliefs", lambda: agent.update_beliefs("opponent", next(actions))
+
+
+def strategy_benchmarks(quick):
+    from strategies.history import MoveHistory
+    rng = random.Random(0)
+    lengths = HISTORY_LENGTHS[::2] if quick else HISTORY_LENGTHS
+    histories = {}
+    for n in lengths:
+        own = MoveHistory(rng.choice("CD") for _ in range(n))
+        opp = MoveHistory(rng.choice("CD") for _ in range(n))
+        histories[n] = (own, opp)
+    for fn in _all_strategies():
+        for n, (own, opp) in histories.items():
+            yield f"micro/strategy/{fn.__name__}/{n}", lambda fn=fn, own=own, opp=opp: fn(own, opp)
+
+
+def mcts_benchmarks(quick):
+    from GameSetup import Agent
+    from Monte_Carlo import MCTS
+    from strategies.deterministic_strategies import tit_for_tat
+    me = Agent("RL", trust_model=1)
+    opponent = Agent("tit_for_tat", strategy_fn=tit_for_tat)
+    for sims in MCTS_SIMULATIONS[:2] if quick else MCTS_SIMULATIONS:
+        mcts = MCTS(["C", "D", "A"], simulations=sims, max_depth=5)
+        yield f"micro/mcts_run/{sims}_simulations", lambda mcts=mcts: mcts.run((me, opponent, []))
+
+
+def gnn_benchmarks(quick):
+    import torch
+    from torch_geometric.data import Data
+    from Graph_Neural_Network import TrustGNN
+    torch.set_num_threads(1)
+    gnn = TrustGNN(input_dim=5, hidden_dim=16, output_dim=2)
+    weights = os.path.join(ROOT, "saved_models", "trust_gnn.pth")
+    if os.path.exists(weights):
+        gnn.load_state_dict(torch.load(weights, map_location="cpu"))
+    gnn.eval()
+    # The two-node (agent, opponent) graph the RL agents score every move
+    data = Data(x=torch.rand(2, 5), edge_index=torch.tensor([[0, 1], [1, 0]]))
+
+    def forward():
+        with torch.no_grad():
+            gnn(data)
+    yield "micro/trust_gnn_forward", forward
+
+    from compiled_gnn import CompiledGNN, script_model
+    compiled = CompiledGNN(script_model(gnn))
+
+    def compiled_forward():
+        with torch.no_grad():
+            compiled(data)
+    yield "micro/trust_gnn_forward_compiled", compiled_forward
+
+    from dense_gnn import DenseGCNScorer
+    dense = DenseGCNScorer.from_model(gnn)
+    features = data.x.unsqueeze(0)
+
+    def dense_forward():
+        with torch.no_grad():
+            dense(features)
+    yield "micro/trust_gnn_forward_dense", dense_forward
+
+
+def tournament_benchmarks(quick):
+    from GameSetup import Agent, Environment
+    rounds = 5 if quick else 25
+
+    def tournament():
+        # Fresh agents each call, as GamesPlaying's final all-strategies run
+        agents = _trust_agents() + [Agent(fn.__name__, strategy_fn=fn) for fn in _all_strategies()]
+        random.seed(0)
+        Environment(agents, rounds=rounds).run()
+    yield f"macro/games_playing_all/{rounds}_rounds", tournament
+
+
+def sweep_benchmarks(quick):
+    import contextlib
+    import io
+    from tournament_runner import run_sweep
+    opponents = _all_strategies()[:2 if quick else 6]
+
+    def sweep():
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_sweep([1, 2], opponents, workers=1, num_episodes=2)
+    yield f"macro/tournament_sweep/{2 * len(opponents)}_matches", sweep
+
+
+BENCHMARKS = (
+    play_round_benchmarks,
+    shared_trust_benchmarks,
+    update_beliefs_benchmarks,
+    strategy_benchmarks,
+    mcts_benchmarks,
+    gnn_benchmarks,
+    tournament_benchmarks,
+    sweep_benchmarks,
+)
+
+
+def run(pattern=None, quick=False, repeats=5, min_time=0.05):
+    results = {}
+    for builder in BENCHMARKS:
+        for name, fn in builder(quick):
+            if pattern and pattern not in name:
+                continue
+            # Macro-benchmarks are whole runs; one call per timing run is plenty
+            macro = name.startswith("macro/")
+            seconds, number = measure(fn, repeats=min(repeats, 3) if macro else repeats,
+                                      min_time=0 if macro else min_time, warmup=0 if macro else 2)
+            results[name] = {"seconds": seconds, "number": number}
+            print(f"{name:<58} {_format(seconds):>10}")
+    return results
+
+
+def _format(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def compare(results, baseline, threshold):
+    """Names of benchmarks slower than baseline * (1 + threshold), printing every ratio."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        elif ratio < 1 / (1 + threshold):
+            flag = "  faster"
+        print(f"{name:<58} {_format(base['seconds']):>10} -> {_format(result['seconds']):>10}  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def _write(path, results, quick):
+    payload = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "processor": platform.processor(), "quick": quick,
+                 "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro- and macro-benchmarks of the simulation hot paths")
+    parser.add_argument("--json", default=None, help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown that counts as a regression (0.25 = 25%% slower)")
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite --baseline with these results")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="fewer history lengths, smaller macro runs")
+    parser.add_argument("--repeats", type=int, default=5, help="timing runs per benchmark")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)  # run_sweep and the GNN load saved_models/ relative to the package
+    results = run(args.filter, args.quick, args.repeats)
+    if args.json:
+        _write(args.json, results, args.quick)
+        print(f"Saved benchmark results to {args.json}")
+    if args.save_baseline:
+        _write(args.baseline, results, args.quick)
+        print(f"Saved baseline to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} (threshold {args.threshold:.0%}):")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("No regressions")
@@ -0,0 +1,180 @@
+import itertools
+import random
+from GameSetup import COOPERATE, DEFECT, ABSTAIN, PAYOFFS
+from strategies.registry import is_deterministic
+
+ACTIONS = (COOPERATE, DEFECT, ABSTAIN)
+
+
+class StrategyMachine:
+    """Moore machine of a deterministic strategy playing against us.
+
+    outputs[s] is the strategy's move in state s, transitions[s][a] the state
+    after we play a (its own move is implied by outputs[s]); state 0 is the
+    start of a match.
+    """
+    def __init__(self, outputs, transitions):
+        self.outputs = outputs
+        self.transitions = transitions
+
+    def __len__(self):
+        return len(self.outputs)
+
+
+# Hand-written machines take precedence over probing (see register_machine)
+MACHINE_REGISTRY = {}
+
+
+def register_machine(strategy_fn, machine):
+    MACHINE_REGISTRY[strategy_fn] = machine
+
+
+def _strategy_oracle(strategy_fn):
+    """Memoized move of strategy_fn after we have played the sequence `ours`."""
+    memo = {(): strategy_fn([], [])}
+
+    def move(ours):
+        if ours not in memo:
+            own = [move(ours[:i]) for i in range(len(ours))]
+            memo[ours] = strategy_fn(own, list(ours))
+        return memo[ours]
+    return move
+
+
+def probe_machine(strategy_fn, max_length=40, max_states=256, tests=300, seed=0):
+    """Learn the minimal machine of strategy_fn by probing it with move sequences.
+
+    States are sequences of our moves that the strategy answers identically
+    after every suffix in a distinguishing set. The machine is checked on
+    constant, alternating, single-switch and random sequences of up to
+    max_length moves; every suffix of a counterexample is added to the set
+    and the machine rebuilt. Returns None if it needs more than max_states states or never
+    agrees with the strategy.
+    """
+    move = _strategy_oracle(strategy_fn)
+    rng = random.Random(seed)
+    test_sequences = [tuple(a * max_length) for a in ACTIONS]
+    test_sequences += [tuple((a + b) * max_length)[:max_length] for a, b in itertools.permutations(ACTIONS, 2)]
+    # One switch after k moves: counting strategies (majorities) differ only on these
+    test_sequences += [tuple(a * k + b * (max_length - k)) for a, b in itertools.permutations(ACTIONS, 2)
+                       for k in range(1, max_length)]
+    test_sequences += [tuple(rng.choice(ACTIONS) for _ in range(max_length)) for _ in range(tests)]
+    suffixes = [()]
+
+    for _ in range(4 * max_length):
+        signature = lambda ours: tuple(move(ours + e) for e in suffixes)
+        states = {signature(()): 0}
+        representatives = [()]
+        transitions = []
+        for ours in representatives:  # grows while we iterate (BFS)
+            row = {}
+            for a in ACTIONS:
+                sig = signature(ours + (a,))
+                if sig not in states:
+                    if len(states) >= max_states:
+                        return None
+                    states[sig] = len(representatives)
+                    representatives.append(ours + (a,))
+                row[a] = states[sig]
+            transitions.append(row)
+        machine = StrategyMachine([move(r) for r in representatives], transitions)
+
+        counterexample = None
+        for seq in test_sequences:
+            state = 0
+            for t in range(len(seq) + 1):
+                if machine.outputs[state] != move(seq[:t]):
+                    counterexample = seq[:t]
+                    break
+                if t < len(seq):
+                    state = transitions[state][seq[t]]
+            if counterexample is not None:
+                break
+        if counterexample is None:
+            return machine
+        new = [counterexample[i:] for i in range(len(counterexample)) if counterexample[i:] not in suffixes]
+        if not new:
+            return None
+        suffixes.extend(new)
+    return None
+
+
+def solve_machine(machine, horizon):
+    """Backward induction over (state, rounds left) under PAYOFFS.
+
+    Returns policy where policy[r][s] is our best move with r rounds left in
+    state s, and value[r][s] the total payoff it secures.
+    """
+    n = len(machine)
+    value = [[0.0] * n]
+    policy = [[None] * n]
+    for r in range(1, horizon + 1):
+        prev = value[-1]
+        v_row, p_row = [], []
+        for s in range(n):
+            opp_move = machine.outputs[s]
+            best, best_value = None, None
+            for a in ACTIONS:
+                v = PAYOFFS[(a, opp_move)][0] + prev[machine.transitions[s][a]]
+                if best_value is None or v > best_value:
+                    best, best_value = a, v
+            v_row.append(best_value)
+            p_row.append(best)
+        value.append(v_row)
+        policy.append(p_row)
+    return policy, value
+
+
+class BestResponder:
+    """Plays the DP-optimal move against one opponent in O(1) per round.
+
+    Tracks the opponent's machine state from the observed moves; if the
+    opponent ever deviates from the machine, valid turns False and the
+    caller should fall back to search.
+    """
+    def __init__(self, machine, policy):
+        self.machine = machine
+        self.policy = policy
+        self.state = 0
+        self.valid = True
+
+    def act(self, rounds_left):
+        return self.policy[rounds_left][self.state]
+
+    def observe(self, own_move, opponent_move):
+        if not self.valid:
+            return
+        if own_move not in ACTIONS or self.machine.outputs[self.state] != opponent_move:
+            self.valid = False
+            return
+        self.state = self.machine.transitions[self.state][own_move]
+
+
+class BestResponseSolver:
+    """Caches opponent machines and their optimal action tables per horizon."""
+    def __init__(self, max_states=256):
+        self.max_states = max_states
+        self.machines = {}
+        self.policies = {}
+
+    def machine(self, strategy_fn, horizon):
+        if strategy_fn in MACHINE_REGISTRY:
+            return MACHINE_REGISTRY[strategy_fn]
+        if not is_deterministic(strategy_fn):
+            return None
+        # A machine is checked on sequences as long as the horizon it will be used for
+        length = max(horizon, 40)
+        key = (strategy_fn, length)
+        if key not in self.machines:
+            self.machines[key] = probe_machine(strategy_fn, max_length=length, max_states=self.max_states)
+        return self.machines[key]
+
+    def responder(self, strategy_fn, horizon):
+        """A fresh BestResponder for a match of `horizon` rounds, or None (use MCTS)."""
+        machine = self.machine(strategy_fn, horizon)
+        if machine is None:
+            return None
+        key = (id(machine), horizon)
+        if key not in self.policies:
+            self.policies[key] = solve_machine(machine, horizon)[0]
+        return BestResponder(machine, self.policies[key])
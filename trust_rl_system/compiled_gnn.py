@@ -0,0 +1,151 @@
+"""Frozen TorchScript inference artifacts for the TrustGNN scorers.
+
+The eager models run torch_geometric message passing, where for the
+2-node graphs MCTS scores nearly all of the time is Python overhead. Here
+the same layers are written as plain tensor code over the edge list
+(self loops, GCN normalization and GAT attention softmax done with
+index_add_/scatter_reduce), scripted, frozen and saved:
+
+    python compiled_gnn.py --export saved_models/trust_gnn.ts
+    python compiled_gnn.py --export saved_models/trust_gat.ts --model gat --weights my_gat.pth
+
+load_compiled() returns a CompiledGNN that is called with a Data/Batch
+like the eager model, so it can stand in as MCTSWithLearningModel's
+gnn_model or in build_rl_agents(compiled=...).
+"""
+import argparse
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+
+def _with_self_loops(edge_index: torch.Tensor, num_nodes: int):
+    """(source, target) with existing self loops dropped and one added per node."""
+    keep = edge_index[0] != edge_index[1]
+    loops = torch.arange(num_nodes, dtype=edge_index.dtype, device=edge_index.device)
+    return torch.cat([edge_index[0][keep], loops]), torch.cat([edge_index[1][keep], loops])
+
+
+class ScriptedGCN(nn.Module):
+    """Graph_Neural_Network.TrustGNN (GCNConv -> ReLU -> Linear) as scriptable tensor code."""
+    def __init__(self, model):
+        super().__init__()
+        self.weight = nn.Parameter(model.gcn1.lin.weight.detach().clone())
+        self.bias = nn.Parameter(model.gcn1.bias.detach().clone())
+        self.lin = nn.Linear(model.lin.in_features, model.lin.out_features)
+        self.lin.load_state_dict(model.lin.state_dict())
+
+    def forward(self, x: torch.Tensor, edge_index: torch.Tensor) -> torch.Tensor:
+        n = x.size(0)
+        source, target = _with_self_loops(edge_index, n)
+        # Symmetric normalization D^-1/2 (A + I) D^-1/2, degrees counted at the target
+        deg = torch.zeros(n, dtype=x.dtype, device=x.device).index_add_(
+            0, target, torch.ones_like(target, dtype=x.dtype))
+        inv_sqrt = deg.pow(-0.5)
+        norm = inv_sqrt.index_select(0, source) * inv_sqrt.index_select(0, target)
+        h = x @ self.weight.t()
+        out = torch.zeros(n, h.size(1), dtype=h.dtype, device=h.device)
+        out = out.index_add_(0, target, h.index_select(0, source) * norm.unsqueeze(1)) + self.bias
+        return self.lin(F.relu(out))
+
+
+def _gat_layer(x: torch.Tensor, source: torch.Tensor, target: torch.Tensor, weight: torch.Tensor,
+               att_src: torch.Tensor, att_dst: torch.Tensor, bias: torch.Tensor,
+               negative_slope: float) -> torch.Tensor:
+    """One single-head GATConv over edges that already include the self loops.
+
+    Gathers use index_select, which is several times faster than advanced
+    indexing on CPU.
+    """
+    n = x.size(0)
+    h = x @ weight.t()
+    alpha = (h @ att_src).index_select(0, source) + (h @ att_dst).index_select(0, target)
+    alpha = F.leaky_relu(alpha, negative_slope)
+    # Softmax over each target's incoming edges
+    peak = torch.zeros(n, dtype=alpha.dtype, device=alpha.device).scatter_reduce(
+        0, target, alpha, reduce="amax", include_self=False)
+    alpha = (alpha - peak.index_select(0, target)).exp()
+    total = torch.zeros(n, dtype=alpha.dtype, device=alpha.device).index_add_(0, target, alpha)
+    alpha = alpha / total.index_select(0, target)
+    out = torch.zeros(n, h.size(1), dtype=h.dtype, device=h.device)
+    return out.index_add_(0, target, h.index_select(0, source) * alpha.unsqueeze(1)) + bias
+
+
+class ScriptedGAT(nn.Module):
+    """GAT.TrustGNN (GATConv -> ELU -> GATConv), single head, as scriptable tensor code."""
+    def __init__(self, model):
+        super().__init__()
+        if model.gat1.heads != 1:
+            raise ValueError("ScriptedGAT supports single-head GAT models only")
+        self.negative_slope = float(model.gat1.negative_slope)
+        for i, layer in ((1, model.gat1), (2, model.gat2)):
+            self.register_parameter(f"weight{i}", nn.Parameter(layer.lin.weight.detach().clone()))
+            self.register_parameter(f"att_src{i}", nn.Parameter(layer.att_src.detach().reshape(-1).clone()))
+            self.register_parameter(f"att_dst{i}", nn.Parameter(layer.att_dst.detach().reshape(-1).clone()))
+            self.register_parameter(f"bias{i}", nn.Parameter(layer.bias.detach().clone()))
+
+    def forward(self, x: torch.Tensor, edge_index: torch.Tensor) -> torch.Tensor:
+        source, target = _with_self_loops(edge_index, x.size(0))
+        h = F.elu(_gat_layer(x, source, target, self.weight1, self.att_src1, self.att_dst1,
+                             self.bias1, self.negative_slope))
+        return _gat_layer(h, source, target, self.weight2, self.att_src2, self.att_dst2,
+                          self.bias2, self.negative_slope)
+
+
+def script_model(model):
+    """Frozen TorchScript module computing model(Data(x, edge_index)) as f(x, edge_index)."""
+    import GAT
+    scripted_cls = ScriptedGAT if isinstance(model, GAT.TrustGNN) else ScriptedGCN
+    module = torch.jit.script(scripted_cls(model).eval())
+    return torch.jit.freeze(module)
+
+
+def export(model, path):
+    """Script, freeze and save model as a CPU inference artifact."""
+    module = script_model(model)
+    torch.jit.save(module, path)
+    return module
+
+
+class CompiledGNN:
+    """A frozen scorer called like the eager TrustGNN: with a Data or Batch."""
+    def __init__(self, module):
+        self.module = module
+
+    def __call__(self, data):
+        return self.module(data.x, data.edge_index)
+
+    def eval(self):
+        return self
+
+
+def load_compiled(path):
+    """CompiledGNN from an artifact written by export()."""
+    return CompiledGNN(torch.jit.load(path, map_location="cpu"))
+
+
+def load_eager(kind="gcn", weights="saved_models/trust_gnn.pth"):
+    """The eager TrustGNN of the given kind ("gcn" or "gat") in eval mode, with weights if given."""
+    if kind == "gat":
+        from GAT import TrustGNN
+        model = TrustGNN(5, 16, 2)
+    else:
+        from Graph_Neural_Network import TrustGNN
+        model = TrustGNN(input_dim=5, hidden_dim=16, output_dim=2)
+    if weights:
+        model.load_state_dict(torch.load(weights, map_location="cpu"))
+    return model.eval()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a TrustGNN as a frozen TorchScript artifact")
+    parser.add_argument("--export", default="saved_models/trust_gnn.ts", help="artifact path to write")
+    parser.add_argument("--model", choices=("gcn", "gat"), default="gcn",
+                        help="Graph_Neural_Network (gcn) or GAT (gat) TrustGNN")
+    parser.add_argument("--weights", default=None,
+                        help="state_dict to load (default: saved_models/trust_gnn.pth for gcn, none for gat)")
+    args = parser.parse_args()
+    weights = args.weights if args.weights is not None else (
+        "saved_models/trust_gnn.pth" if args.model == "gcn" else None)
+    export(load_eager(args.model, weights), args.export)
+    print(f"Saved {args.model} TorchScript artifact to {args.export}")
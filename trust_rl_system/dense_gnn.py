@@ -0,0 +1,100 @@
+"""Dense TrustGNN scorers for the fixed 2-node MCTS leaf graph.
+
+Every leaf MCTSWithLearningModel scores is the same graph: the agent and
+its opponent joined by an edge in each direction. With the self loops the
+layers add, it is the complete graph on 2 nodes, so the GCN normalization
+D^-1/2 (A + I) D^-1/2 is the constant 2x2 matrix of 1/2 and GAT attends
+over both nodes from each. The scorers here take a (B, 2, 5) batch of leaf
+features and run the same computation as plain matmuls, with no Data
+objects, edge indices or torch_geometric import; the GCN's fixed
+normalization is precomputed into its weights.
+
+    scorer = DenseGCNScorer.load("saved_models/trust_gnn.pth")
+    mcts = MCTSWithLearningModel(actions, dense_scorer=scorer, ...)
+"""
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+# D^-1/2 (A + I) D^-1/2 of the bidirectional pair: both degrees are 2
+PAIR_NORMALIZED_ADJACENCY = torch.full((2, 2), 0.5)
+
+
+class DenseScorer(nn.Module):
+    """Base of the dense scorers: forward((B, 2, 5)) gives the (B, 2, 2) node outputs."""
+
+    @torch.inference_mode()
+    def values(self, features):
+        """Leaf values, as MCTSWithLearningModel takes them from the eager model: the mean of
+        each graph's node outputs. features is a (B, 2, 5) tensor or nested lists."""
+        x = torch.as_tensor(features, dtype=torch.float32)
+        return self(x).mean(dim=(1, 2)).tolist()
+
+
+class DenseGCNScorer(DenseScorer):
+    """Graph_Neural_Network.TrustGNN (GCNConv -> ReLU -> Linear) on the 2-node pair.
+
+    The pair's normalized adjacency is folded into the layer weights: with
+    a batch flattened to (B, 10), kron(A^T, W) mixes the two nodes and
+    applies the GCN weight in one matmul, and kron(I, W_out) applies the
+    output layer to both nodes in another.
+    """
+    def __init__(self, state_dict):
+        super().__init__()
+        weight = state_dict["gcn1.lin.weight"].t().contiguous()
+        out_weight = state_dict["lin.weight"].t().contiguous()
+        self.register_buffer("weight", torch.kron(PAIR_NORMALIZED_ADJACENCY.t().contiguous(), weight))
+        self.register_buffer("bias", state_dict["gcn1.bias"].repeat(2))
+        self.register_buffer("out_weight", torch.kron(torch.eye(2), out_weight))
+        self.register_buffer("out_bias", state_dict["lin.bias"].repeat(2))
+
+    @classmethod
+    def load(cls, path="saved_models/trust_gnn.pth"):
+        return cls(torch.load(path, map_location="cpu"))
+
+    @classmethod
+    def from_model(cls, model):
+        return cls({k: v.detach() for k, v in model.state_dict().items()})
+
+    def forward(self, x):
+        batch = x.shape[0]
+        h = torch.relu(torch.addmm(self.bias, x.reshape(batch, -1), self.weight))
+        return torch.addmm(self.out_bias, h, self.out_weight).reshape(batch, 2, -1)
+
+
+class DenseGATScorer(DenseScorer):
+    """GAT.TrustGNN (GATConv -> ELU -> GATConv, one head) on the 2-node pair."""
+    def __init__(self, state_dict, negative_slope=0.2):
+        super().__init__()
+        self.negative_slope = negative_slope
+        for i in (1, 2):
+            self.register_buffer(f"weight{i}", state_dict[f"gat{i}.lin.weight"].t().contiguous())
+            self.register_buffer(f"att_src{i}", state_dict[f"gat{i}.att_src"].reshape(-1, 1).clone())
+            self.register_buffer(f"att_dst{i}", state_dict[f"gat{i}.att_dst"].reshape(-1, 1).clone())
+            self.register_buffer(f"bias{i}", state_dict[f"gat{i}.bias"].clone())
+
+    @classmethod
+    def load(cls, path):
+        return cls(torch.load(path, map_location="cpu"))
+
+    @classmethod
+    def from_model(cls, model):
+        if model.gat1.heads != 1:
+            raise ValueError("DenseGATScorer supports single-head GAT models only")
+        return cls({k: v.detach() for k, v in model.state_dict().items()}, model.gat1.negative_slope)
+
+    def _layer(self, x, weight, att_src, att_dst, bias):
+        h = x @ weight                                                   # (B, 2, C)
+        # scores[b, i, j]: node i attending to node j (itself or the other)
+        scores = (h @ att_dst) + (h @ att_src).transpose(1, 2)            # (B, 2, 2)
+        scores = F.leaky_relu(scores, self.negative_slope)
+        # A softmax over two candidates is a sigmoid of their difference, and
+        # alpha @ h is then a blend of the two nodes (both far cheaper than
+        # softmax and a batched 2x2 matmul)
+        to_first = torch.sigmoid(scores[:, :, :1] - scores[:, :, 1:])     # (B, 2, 1)
+        first, second = h[:, :1], h[:, 1:]
+        return second + to_first * (first - second) + bias
+
+    def forward(self, x):
+        h = F.elu(self._layer(x, self.weight1, self.att_src1, self.att_dst1, self.bias1))
+        return self._layer(h, self.weight2, self.att_src2, self.att_dst2, self.bias2)
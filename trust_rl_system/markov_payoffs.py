@@ -0,0 +1,213 @@
+import numpy as np
+from GameSetup import COOPERATE, DEFECT, ABSTAIN, PAYOFFS
+from best_response import ACTIONS, BestResponseSolver
+from strategies.stochastic_strategies import (
+    random_agent, generous_tit_for_tat, noisy_tft, random_tit_for_tat,
+    stochastic_grudger, sometimes_cooperate, sometimes_defect,
+)
+from strategies.deceptive_strategies import sneak_attack
+
+C, D, A = COOPERATE, DEFECT, ABSTAIN
+
+
+class MarkovMachine:
+    """Finite-memory model of a (possibly stochastic) strategy.
+
+    outputs[s] maps each move to its probability in state s; transitions[s]
+    maps (own_move, opponent_move) to the next state. State 0 is the start
+    of a match.
+    """
+    def __init__(self, outputs, transitions):
+        self.outputs = outputs
+        self.transitions = transitions
+
+    def __len__(self):
+        return len(self.outputs)
+
+    @classmethod
+    def from_strategy_machine(cls, machine):
+        """Lift a deterministic StrategyMachine (from best_response) into a MarkovMachine."""
+        outputs = [{move: 1.0} for move in machine.outputs]
+        transitions = [
+            {(own, opp): row[opp] for own in ACTIONS for opp in ACTIONS}
+            for row in machine.transitions
+        ]
+        return cls(outputs, transitions)
+
+    @classmethod
+    def opponent_memory(cls, opening, replies):
+        """Memory-one machine on the opponent's last move: opening before any move,
+        replies[m] after the opponent last played m."""
+        order = [None] + list(ACTIONS)
+        outputs = [opening] + [replies[m] for m in ACTIONS]
+        row = {(own, opp): order.index(opp) for own in ACTIONS for opp in ACTIONS}
+        return cls(outputs, [row] * len(outputs))
+
+
+def _constant(dist):
+    return MarkovMachine([dist], [{(own, opp): 0 for own in ACTIONS for opp in ACTIONS}])
+
+
+def _grudger_machine(grudge):
+    clean = {(own, opp): 1 if opp == D else 0 for own in ACTIONS for opp in ACTIONS}
+    held = {(own, opp): 1 for own in ACTIONS for opp in ACTIONS}
+    return MarkovMachine([{C: 1.0}, grudge], [clean, held])
+
+
+def _counting_machine(moves, steady):
+    """Plays moves[i] in round i, then the `steady` distribution forever."""
+    n = len(moves)
+    outputs = [{m: 1.0} for m in moves] + [steady]
+    transitions = [{(own, opp): min(s + 1, n) for own in ACTIONS for opp in ACTIONS} for s in range(n + 1)]
+    return MarkovMachine(outputs, transitions)
+
+
+# Hand-written models of the strategies that call random; deterministic
+# strategies are probed through best_response instead.
+STOCHASTIC_MACHINES = {
+    random_agent: _constant({C: 0.5, D: 0.5}),
+    sometimes_cooperate: _constant({C: 0.7, D: 0.3}),
+    sometimes_defect: _constant({D: 0.7, C: 0.3}),
+    generous_tit_for_tat: MarkovMachine.opponent_memory(
+        {C: 1.0}, {C: {C: 1.0}, D: {C: 0.3, D: 0.7}, A: {C: 0.3, D: 0.7}}),
+    noisy_tft: MarkovMachine.opponent_memory(
+        {C: 1.0}, {C: {C: 0.9, D: 0.1}, D: {D: 0.9, C: 0.1}, A: {A: 0.9, C: 0.1}}),
+    random_tit_for_tat: MarkovMachine.opponent_memory(
+        {C: 1.0}, {C: {C: 0.5, D: 0.5}, D: {D: 0.5, C: 0.5}, A: {A: 0.5, D: 0.5}}),
+    stochastic_grudger: _grudger_machine({D: 0.7, C: 0.3}),
+    sneak_attack: _counting_machine([C] * 5, {D: 0.2, C: 0.8}),
+}
+
+
+def register_stochastic_machine(strategy_fn, machine):
+    STOCHASTIC_MACHINES[strategy_fn] = machine
+
+
+class MarkovPayoffEngine:
+    """Exact expected match payoffs between finite-memory strategies.
+
+    Each pair of machines is combined into a joint Markov chain over
+    (state1, state2); expected totals over T rounds come from one matrix
+    power of the chain augmented with its reward columns, the long-run
+    per-round average from the Cesaro limit of the chain.
+
+    history=True models a pairwise match in which both sides see the moves
+    played so far (Phase3Simulator, tournament_runner). history=False models
+    Environment.run, where strategies are only ever shown empty histories
+    and so repeat their opening distribution every round.
+
+    Deterministic strategies are probed on sequences of probe_length moves,
+    or of the match length when that is longer. Counting strategies (the
+    majority family) keep growing state, so a model is only guaranteed for
+    matches up to the length it was probed on, and probing them for long
+    matches is slow (minutes at a few hundred rounds). Long-run averages use
+    the probe_length models.
+    """
+    def __init__(self, history=True, solver=None, probe_length=40):
+        self.history = history
+        self.solver = solver or BestResponseSolver()
+        self.probe_length = probe_length
+        self.machines = {}
+        self.chains = {}
+
+    def machine(self, strategy_fn, rounds=None):
+        """Model of strategy_fn, probed (if deterministic) on sequences of at least `rounds` moves."""
+        stochastic = STOCHASTIC_MACHINES.get(strategy_fn)
+        length = max(self.probe_length, rounds or 0)
+        key = (strategy_fn, self.history, None if stochastic or not self.history else length)
+        if key not in self.machines:
+            machine = stochastic
+            if not self.history:
+                opening = machine.outputs[0] if machine is not None else {strategy_fn([], []): 1.0}
+                machine = _constant(opening)
+            elif machine is None:
+                probed = self.solver.machine(strategy_fn, length)
+                if probed is None:
+                    raise ValueError(f"no finite-memory model for strategy {strategy_fn.__name__}")
+                machine = MarkovMachine.from_strategy_machine(probed)
+            self.machines[key] = machine
+        return self.machines[key]
+
+    def chain(self, m1, m2):
+        """Transition matrix P, start distribution and per-state expected payoffs (n, 2)
+        over the joint states reachable from the start of a match."""
+        key = (id(m1), id(m2))
+        if key in self.chains:
+            return self.chains[key]
+        index = {(0, 0): 0}
+        order = [(0, 0)]
+        edges, rewards = [], []
+        for s1, s2 in order:  # grows while we iterate (BFS)
+            row, reward = {}, np.zeros(2)
+            for a1, p1 in m1.outputs[s1].items():
+                for a2, p2 in m2.outputs[s2].items():
+                    p = p1 * p2
+                    nxt = (m1.transitions[s1][(a1, a2)], m2.transitions[s2][(a2, a1)])
+                    if nxt not in index:
+                        index[nxt] = len(order)
+                        order.append(nxt)
+                    row[index[nxt]] = row.get(index[nxt], 0.0) + p
+                    reward += p * np.asarray(PAYOFFS[(a1, a2)])
+            edges.append(row)
+            rewards.append(reward)
+        n = len(order)
+        P = np.zeros((n, n))
+        for s, row in enumerate(edges):
+            for t, p in row.items():
+                P[s, t] = p
+        start = np.zeros(n)
+        start[0] = 1.0
+        self.chains[key] = (P, start, np.array(rewards))
+        return self.chains[key]
+
+    def expected_payoffs(self, strategy1, strategy2, rounds):
+        """Expected total payoffs (to strategy1, to strategy2) over `rounds` rounds."""
+        P, start, R = self.chain(self.machine(strategy1, rounds), self.machine(strategy2, rounds))
+        n = len(start)
+        # [[P, R], [0, I]]^T has sum_{t<T} P^t R in its top-right block
+        aug = np.zeros((n + 2, n + 2))
+        aug[:n, :n] = P
+        aug[:n, n:] = R
+        aug[n:, n:] = np.eye(2)
+        total = np.linalg.matrix_power(aug, rounds)[:n, n:]
+        return tuple(start @ total)
+
+    def average_payoffs(self, strategy1, strategy2, tol=1e-12, max_squarings=64):
+        """Long-run expected payoff per round (to strategy1, to strategy2).
+
+        Uses the lazy chain (I + P) / 2, whose powers converge to the Cesaro
+        limit of P even when P is periodic or has several closed classes.
+        """
+        P, start, R = self.chain(self.machine(strategy1), self.machine(strategy2))
+        L = 0.5 * (np.eye(len(start)) + P)
+        for _ in range(max_squarings):
+            nxt = L @ L
+            if np.abs(nxt - L).max() < tol:
+                L = nxt
+                break
+            L = nxt
+        return tuple(start @ L @ R)
+
+    def payoff_matrix(self, strategies, rounds=None):
+        """N x N array of expected scores of strategies[i] against strategies[j]:
+        totals over `rounds` rounds, or per-round long-run averages if rounds is None."""
+        n = len(strategies)
+        M = np.zeros((n, n))
+        for i in range(n):
+            for j in range(i, n):
+                if rounds is None:
+                    pi, pj = self.average_payoffs(strategies[i], strategies[j])
+                else:
+                    pi, pj = self.expected_payoffs(strategies[i], strategies[j], rounds)
+                M[i, j], M[j, i] = pi, pj
+        return M
+
+    def match_scores(self, agents, rounds):
+        """Expected Environment.match_scores for strategy agents, keyed by (name, name)."""
+        scores = {}
+        for i, agent1 in enumerate(agents):
+            for agent2 in agents[i + 1:]:
+                p1, p2 = self.expected_payoffs(agent1.strategy, agent2.strategy, rounds)
+                scores[(agent1.name, agent2.name)] = p1
+                scores[(agent2.name, agent1.name)] = p2
+        return scores
@@ -0,0 +1,112 @@
+import hashlib
+import inspect
+import json
+import sqlite3
+from functools import lru_cache
+
+# Seed recorded for matches whose outcome does not depend on the RNG
+NO_SEED = -1
+
+
+def source_hash(*objs):
+    """Short sha256 of the source of functions/classes/modules (a function's bytecode if the source is unavailable)."""
+    digest = hashlib.sha256()
+    for obj in objs:
+        try:
+            digest.update(inspect.getsource(obj).encode())
+        except (OSError, TypeError):
+            code = getattr(obj, "__code__", None)
+            if code is not None:
+                digest.update(code.co_code)
+    return digest.hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def strategy_fingerprint(strategy_fn):
+    """(name, source hash) identifying a strategy; editing its code changes the hash.
+
+    The hash covers the whole module the strategy is defined in, so edits
+    to helpers and constants it uses there count too (at the cost of
+    invalidating the module's other strategies). Memoized per process, so
+    edits take effect in the next run.
+    """
+    module = inspect.getmodule(strategy_fn)
+    parts = (strategy_fn,) if module is None else (strategy_fn, module)
+    return f"{strategy_fn.__module__}.{strategy_fn.__qualname__}", source_hash(*parts)
+
+
+class MatchCache:
+    """Persistent sqlite cache of pairwise match outcomes.
+
+    A row is keyed by both sides' fingerprints, the round count, the seed and
+    a free-form params string, and holds a JSON payload. When a side is seen
+    with a new source hash, every row recorded under an older hash of the
+    same name is deleted, so editing a strategy invalidates its matches.
+    """
+    def __init__(self, path="match_cache.sqlite"):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS matches ("
+            " name1 TEXT, hash1 TEXT, name2 TEXT, hash2 TEXT,"
+            " rounds INTEGER, seed INTEGER, params TEXT, payload TEXT,"
+            " PRIMARY KEY (name1, hash1, name2, hash2, rounds, seed, params))"
+        )
+        self.conn.commit()
+        self.checked = set()
+        self.hits = 0
+        self.misses = 0
+
+    def _validate(self, fingerprint):
+        """Drop rows recorded under an older version of this side."""
+        if fingerprint in self.checked:
+            return
+        name, digest = fingerprint
+        self.conn.execute(
+            "DELETE FROM matches WHERE (name1 = ? AND hash1 != ?) OR (name2 = ? AND hash2 != ?)",
+            (name, digest, name, digest),
+        )
+        self.conn.commit()
+        self.checked.add(fingerprint)
+
+    def _key(self, side1, side2, rounds, seed, params):
+        self._validate(side1)
+        self._validate(side2)
+        return (*side1, *side2, rounds, NO_SEED if seed is None else seed, params)
+
+    def get(self, side1, side2, rounds, seed=None, params=""):
+        """Cached payload for the match, or None. Sides are strategy_fingerprint tuples."""
+        row = self.conn.execute(
+            "SELECT payload FROM matches WHERE name1 = ? AND hash1 = ? AND name2 = ? AND hash2 = ?"
+            " AND rounds = ? AND seed = ? AND params = ?",
+            self._key(side1, side2, rounds, seed, params),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, side1, side2, rounds, payload, seed=None, params="", commit=True):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (*self._key(side1, side2, rounds, seed, params), json.dumps(payload)),
+        )
+        if commit:
+            self.conn.commit()
+
+    def commit(self):
+        self.conn.commit()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,147 @@
+import math
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from Monte_Carlo import UCTNode
+from worker_pool import derive_seed, init_worker
+
+
+def _search_tree(mcts, root_state, simulations, seed):
+    """Grow one independent tree and return its root children's (visits, total reward) by action."""
+    random.seed(seed)
+    try:
+        import torch
+        torch.manual_seed(seed)
+    except ImportError:
+        pass
+    root = UCTNode(state=root_state)
+    mcts.search(root, simulations)
+    return {child.action: (child.visits, child.total_reward) for child in root.children}
+
+
+class RootParallelMCTS:
+    """Root parallelization: independent trees in worker processes, merged at the root.
+
+    mcts.simulations is split across `trees` searches, each run with its own
+    derived seed on a copy of mcts (MCTS or MCTSWithLearningModel). The
+    root children's visit counts are summed per action and the most visited
+    action wins. Seeds depend only on seed, the call number and the tree
+    index, so results do not depend on the worker count.
+    """
+    def __init__(self, mcts, workers=None, trees=None, seed=0):
+        self.mcts = mcts
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker)
+        self.trees = trees or self.workers
+        self.seed = seed
+        self.calls = 0
+        self.root_stats = {}
+
+    def run(self, root_state):
+        per_tree = math.ceil(self.mcts.simulations / self.trees)
+        futures = [
+            self.pool.submit(_search_tree, self.mcts, root_state, per_tree,
+                             derive_seed(self.seed, self.calls, tree))
+            for tree in range(self.trees)
+        ]
+        self.calls += 1
+        merged = {}
+        for future in futures:
+            for action, (visits, total) in future.result().items():
+                v, t = merged.get(action, (0, 0.0))
+                merged[action] = (v + visits, t + total)
+        self.root_stats = merged
+        if not merged:
+            return random.choice(self.mcts.action_space)
+        return max(merged, key=lambda action: merged[action][0])
+
+    def select_action(self, agent, opponent):
+        return self.run((agent, opponent, []))
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_worker_mcts = None
+
+
+def _init_leaf_worker(mcts, seed, started):
+    global _worker_mcts
+    init_worker()
+    _worker_mcts = mcts
+    # started counts the workers initialized so far, so each gets its own stream
+    with started.get_lock():
+        worker = started.value
+        started.value += 1
+    random.seed(derive_seed(seed, "leaf", worker))
+
+
+def _worker_rollout(state):
+    return _worker_mcts.rollout(state)
+
+
+class LeafParallelMCTS:
+    """Leaf parallelization: one tree, rollouts of a batch of leaves run concurrently.
+
+    Each step selects batch_size leaves (virtual loss keeps the selections
+    apart), evaluates their rollouts on a thread pool (useful when rollouts
+    release the GIL, e.g. the GNN scorer) or a process pool (pure-Python
+    random rollouts), then backpropagates the results. Process workers get a
+    copy of mcts when the pool starts. Each process worker seeds its
+    rollouts with a seed derived from seed and its start order, so no two
+    workers replay the same random stream; which leaves a worker gets is
+    up to the pool, so runs are not reproducible across worker counts.
+    """
+    def __init__(self, mcts, workers=None, batch_size=None, executor="thread", seed=0):
+        self.mcts = mcts
+        if executor == "thread":
+            self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+            self.pool = ThreadPoolExecutor(max_workers=self.workers)
+            self._rollout = mcts.rollout
+        elif executor == "process":
+            self.workers = workers or os.cpu_count() or 1
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_leaf_worker,
+                                            initargs=(mcts, seed, multiprocessing.Value("i", 0)))
+            self._rollout = _worker_rollout
+        else:
+            raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+        self.batch_size = batch_size or 4 * self.workers
+
+    def run(self, root_state):
+        mcts = self.mcts
+        root = UCTNode(state=root_state)
+        done = 0
+        while done < mcts.simulations:
+            leaves = []
+            for _ in range(min(self.batch_size, mcts.simulations - done)):
+                leaf = mcts.tree_policy(root)
+                mcts._apply_virtual_loss(leaf, 1)
+                leaves.append(leaf)
+            chunksize = max(1, len(leaves) // (4 * self.workers))
+            rewards = self.pool.map(self._rollout, [leaf.state for leaf in leaves], chunksize=chunksize)
+            for leaf, reward in zip(leaves, rewards):
+                mcts._apply_virtual_loss(leaf, -1)
+                leaf.backpropagate(reward)
+            done += len(leaves)
+        if not root.children:
+            return random.choice(mcts.action_space)
+        return max(root.children, key=lambda c: c.visits).action
+
+    def select_action(self, agent, opponent):
+        return self.run((agent, opponent, []))
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,20 +1,33 @@
 import random
-import pandas as pd
-import torch
-import torch.nn.functional as F
-from torch_geometric.data import Data
-from Graph_Neural_Network import TrustGNN
-from Monte_Carlo import MCTS
+from Monte_Carlo import MCTSWithLearningModel
 from GameSetup import Agent, COOPERATE, DEFECT, ABSTAIN
 
 class Phase3Simulator:
-    def __init__(self, agent1, agent2, mcts1, mcts2, num_episodes=5, max_rounds=5):
+    def __init__(self, agent1, agent2, mcts1, mcts2, num_episodes=5, max_rounds=5,
+                 move_time_budget=None, best_response=None):
         self.agent1 = agent1
         self.agent2 = agent2
         self.mcts1 = mcts1
         self.mcts2 = mcts2
         self.num_episodes = num_episodes
         self.max_rounds = max_rounds
+        # Per-move latency budget (seconds) for searchers with select_action_anytime
+        self.move_time_budget = move_time_budget
+        self.search_stats = []
+        # BestResponseSolver: exact DP play against deterministic strategies (MCTS stays the fallback)
+        self.best_response = best_response
+
+    def _responder(self, player, opponent):
+        """DP best responder for a strategy-less player facing a solvable strategy, else None."""
+        if self.best_response is None or player.strategy is not None or opponent.strategy is None:
+            return None
+        return self.best_response.responder(opponent.strategy, self.max_rounds)
+
+    def _decide(self, player, opponent, mcts, responder, rounds_left):
+        if responder is not None and responder.valid:
+            return responder.act(rounds_left)
+        return self._decide_with_possible_mcts(player, opponent, mcts)
+
     def _decide_with_possible_mcts(self, player, opponent, mcts):
         # Inject some randomness for trust-based agents
         exploration_rate = 0.2
@@ -25,18 +38,37 @@ class Phase3Simulator:
 
         if mcts is None:
             return player.decide_action(opponent, shared_trust={})
-        
+
+        if self.move_time_budget is not None and hasattr(mcts, "select_action_anytime"):
+            action, stats = mcts.select_action_anytime(player, opponent, time_budget=self.move_time_budget)
+            self.search_stats.append(stats)
+            return action
+
         return mcts.run_simulation(player, opponent)
 
 
-    def run(self):
-        data = []
+    def run(self, sink=None):
+        """One row per episode: a DataFrame, or appended to sink (a ResultsSink) if given."""
+        if sink is not None:
+            sink.extend(self.iter_results())
+            return sink
+        import pandas as pd
+        return pd.DataFrame(list(self.iter_results()))
+
+    def iter_results(self):
         for episode in range(self.num_episodes):
             self.agent1.reset()
             self.agent2.reset()
+            responder1 = self._responder(self.agent1, self.agent2)
+            responder2 = self._responder(self.agent2, self.agent1)
             for round in range(self.max_rounds):
-                action1 = self._decide_with_possible_mcts(self.agent1, self.agent2, self.mcts1)
-                action2 = self._decide_with_possible_mcts(self.agent2, self.agent1, self.mcts2)
+                rounds_left = self.max_rounds - round
+                action1 = self._decide(self.agent1, self.agent2, self.mcts1, responder1, rounds_left)
+                action2 = self._decide(self.agent2, self.agent1, self.mcts2, responder2, rounds_left)
+                if responder1 is not None:
+                    responder1.observe(action1, action2)
+                if responder2 is not None:
+                    responder2.observe(action2, action1)
 
                 payoff1, payoff2 = self.get_payoff(action1, action2)
                 self.agent1.wealth += payoff1
@@ -47,15 +79,13 @@ class Phase3Simulator:
                 self.agent1.opponent_history.append(action2)
                 self.agent2.opponent_history.append(action1)
 
-            result = {
+            yield {
                 "agent": self.agent1.name,
                 "total_wealth": self.agent1.wealth,
                 "num_cooperate": self.agent1.history.count(COOPERATE),
                 "num_defect": self.agent1.history.count(DEFECT),
                 "num_abstain": self.agent1.history.count(ABSTAIN),
             }
-            data.append(result)
-        return pd.DataFrame(data)
 
     def get_payoff(self, action1, action2):
         return {
@@ -70,16 +100,30 @@ class Phase3Simulator:
             (ABSTAIN, DEFECT): (0, 0),
         }[(action1, action2)]
 
-def build_rl_agents(trust_model=1):
-    gnn = TrustGNN(input_dim=5, hidden_dim=16, output_dim=2)
+def build_rl_agents(trust_model=1, compiled=None):
+    """Two RL agents and their searchers, which score leaves with one shared TrustGNN.
+
+    compiled is the path of a compiled_gnn artifact to score with instead of
+    the eager model loaded from saved_models/trust_gnn.pth.
+    """
+    # torch and torch_geometric load here, so importing this module stays cheap
+    from GAT import build_trust_graph
+    if compiled is not None:
+        from compiled_gnn import load_compiled
+        gnn = load_compiled(compiled)
+    else:
+        import torch
+        from Graph_Neural_Network import TrustGNN
+        gnn = TrustGNN(input_dim=5, hidden_dim=16, output_dim=2)
 
-    try:
-        gnn.load_state_dict(torch.load("saved_models/trust_gnn.pth", map_location="cpu"))
-    except Exception as e:
-        print(f"❌ Error loading model weights: {e}")
+        try:
+            gnn.load_state_dict(torch.load("saved_models/trust_gnn.pth", map_location="cpu"))
+        except Exception as e:
+            print(f"❌ Error loading model weights: {e}")
 
     agent1 = Agent("RLAgent1", trust_model=trust_model)
     agent2 = Agent("RLAgent2", trust_model=trust_model)
-    mcts1 = MCTS(agent1, gnn)
-    mcts2 = MCTS(agent2, gnn)
+    actions = [COOPERATE, DEFECT, ABSTAIN]
+    mcts1 = MCTSWithLearningModel(actions, gnn_model=gnn, build_graph_fn=build_trust_graph)
+    mcts2 = MCTSWithLearningModel(actions, gnn_model=gnn, build_graph_fn=build_trust_graph)
     return agent1, mcts1, agent2, mcts2
@@ -0,0 +1,223 @@
+import functools
+import json
+import marshal
+import os
+import threading
+import time
+
+TRUST_MODEL_NAMES = {1: "PersonalTrust", 2: "TRAVOSTrust", 3: "HearsayTrust",
+                     4: "DefectiveAgent", 5: "AdversaryAgent"}
+
+
+def _decide_phase(agent):
+    # Strategy agents and each trust model get their own row
+    if agent.strategy is not None:
+        return "Agent.decide_action[strategy]"
+    return f"Agent.decide_action[{TRUST_MODEL_NAMES.get(agent.trust_model, agent.trust_model)}]"
+
+
+def instrumented_methods():
+    """(class, method name, phase function or None) for every instrumented hot path.
+
+    A phase function maps the receiver to its phase name; by default the
+    phase is "Class.method".
+    """
+    from GameSetup import Agent, Environment
+    from Monte_Carlo import MCTS, MCTSWithLearningModel, UCTNode
+    return [
+        (Environment, "play_round", None),
+        (Environment, "calculate_shared_trust", None),
+        (Agent, "decide_action", _decide_phase),
+        (Agent, "update_trust", None),
+        (Agent, "update_beliefs", None),
+        (MCTS, "tree_policy", None),
+        (MCTS, "rollout", None),
+        (UCTNode, "backpropagate", None),
+        (MCTSWithLearningModel, "rollout", None),
+        (MCTSWithLearningModel, "evaluate_leaves", None),
+    ]
+
+
+class Instrumentation:
+    """Per-phase call counters and cumulative timers for the simulation hot paths.
+
+    install() swaps the methods listed by instrumented_methods() for timing
+    wrappers and uninstall() puts the originals back, so nothing is paid
+    while instrumentation is off. Each phase records its call count, its
+    total (inclusive) time and its own time (total minus instrumented
+    phases called from it); re-entrant calls, such as the recursive
+    UCTNode.backpropagate, are timed once at the outermost call. With
+    trace=True every call is also kept as a Chrome trace event, up to
+    max_events.
+
+    Results are a summary() table, a Chrome trace (write_chrome_trace, for
+    chrome://tracing or Perfetto) and a pstats file (write_pstats, for
+    pstats.Stats or snakeviz). snapshot() and merge() carry the counters of
+    worker processes back to the parent.
+    """
+    _installed = None
+
+    def __init__(self, trace=True, max_events=1_000_000):
+        self.trace = trace
+        self.max_events = max_events
+        self._local = threading.local()
+        self._originals = []
+        self.reset()
+
+    def reset(self):
+        self.stats = {}     # phase -> [calls, total, own]
+        self.callers = {}   # (phase, caller phase) -> [calls, total, own]
+        self.sites = {}     # phase -> (file, line) of the instrumented function
+        self.events = []
+        self.dropped = 0
+
+    # -- installing ------------------------------------------------------
+
+    def install(self):
+        if Instrumentation._installed is not None:
+            raise RuntimeError("another Instrumentation is already installed")
+        for cls, name, phase_fn in instrumented_methods():
+            func = cls.__dict__[name]
+            phase = f"{cls.__name__}.{name}"
+            code = func.__code__
+            self.sites.setdefault(phase, (code.co_filename, code.co_firstlineno))
+            setattr(cls, name, self._wrap(func, phase, phase_fn))
+            self._originals.append((cls, name, func))
+        Instrumentation._installed = self
+        return self
+
+    def uninstall(self):
+        for cls, name, func in reversed(self._originals):
+            setattr(cls, name, func)
+        self._originals = []
+        if Instrumentation._installed is self:
+            Instrumentation._installed = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    def _wrap(self, func, phase, phase_fn):
+        call = self._call
+        if phase_fn is None:
+            def wrapper(*args, **kwargs):
+                return call(phase, func, args, kwargs)
+        else:
+            code = func.__code__
+            site = (code.co_filename, code.co_firstlineno)
+
+            def wrapper(receiver, *args, **kwargs):
+                name = phase_fn(receiver)
+                if name not in self.sites:
+                    self.sites[name] = site
+                return call(name, func, (receiver,) + args, kwargs)
+        return functools.wraps(func)(wrapper)
+
+    # -- timing ----------------------------------------------------------
+
+    def _call(self, phase, func, args, kwargs):
+        local = self._local
+        stack = getattr(local, "stack", None)
+        if stack is None:
+            stack = local.stack = []
+            local.active = set()
+        if phase in local.active:
+            return func(*args, **kwargs)
+        local.active.add(phase)
+        frame = [phase, 0.0]  # phase, time spent in instrumented callees
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            local.active.discard(phase)
+            own = elapsed - frame[1]
+            caller = stack[-1][0] if stack else None
+            if stack:
+                stack[-1][1] += elapsed
+            row = self.stats.get(phase)
+            if row is None:
+                row = self.stats[phase] = [0, 0.0, 0.0]
+            row[0] += 1
+            row[1] += elapsed
+            row[2] += own
+            if caller is not None:
+                edge = self.callers.get((phase, caller))
+                if edge is None:
+                    edge = self.callers[(phase, caller)] = [0, 0.0, 0.0]
+                edge[0] += 1
+                edge[1] += elapsed
+                edge[2] += own
+            if self.trace:
+                if len(self.events) < self.max_events:
+                    self.events.append((phase, start, elapsed, os.getpid(), threading.get_ident()))
+                else:
+                    self.dropped += 1
+
+    # -- results ---------------------------------------------------------
+
+    def snapshot(self):
+        """Picklable copy of everything recorded, for merge() in another process."""
+        return {"stats": self.stats, "callers": self.callers, "sites": self.sites,
+                "events": self.events, "dropped": self.dropped}
+
+    def merge(self, snapshot):
+        for table, other in ((self.stats, snapshot["stats"]), (self.callers, snapshot["callers"])):
+            for key, (calls, total, own) in other.items():
+                row = table.setdefault(key, [0, 0.0, 0.0])
+                row[0] += calls
+                row[1] += total
+                row[2] += own
+        for phase, site in snapshot["sites"].items():
+            self.sites.setdefault(phase, site)
+        room = max(0, self.max_events - len(self.events))
+        self.events.extend(snapshot["events"][:room])
+        self.dropped += snapshot["dropped"] + max(0, len(snapshot["events"]) - room)
+
+    def summary(self):
+        """Table of phases by own time: calls, total and own seconds, mean and share of own time."""
+        if not self.stats:
+            return "No instrumented calls recorded"
+        own_sum = sum(row[2] for row in self.stats.values()) or 1.0
+        lines = [f"{'phase':<44} {'calls':>10} {'total s':>10} {'own s':>10} {'mean us':>10} {'own %':>7}"]
+        for phase, (calls, total, own) in sorted(self.stats.items(), key=lambda kv: -kv[1][2]):
+            lines.append(f"{phase:<44} {calls:>10} {total:>10.4f} {own:>10.4f} "
+                         f"{total / calls * 1e6:>10.2f} {100 * own / own_sum:>6.1f}%")
+        if self.dropped:
+            lines.append(f"({self.dropped} trace events dropped past max_events={self.max_events})")
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, path):
+        """Trace Event Format JSON: one complete ("X") event per recorded call, in microseconds."""
+        events = [
+            {"name": phase, "cat": phase.split(".")[0], "ph": "X", "ts": start * 1e6,
+             "dur": elapsed * 1e6, "pid": pid, "tid": tid}
+            for phase, start, elapsed, pid, tid in self.events
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def write_pstats(self, path):
+        """marshal'd stats dict in the layout cProfile writes, so pstats.Stats(path) can load it."""
+        def key(phase):
+            filename, line = self.sites.get(phase, ("~", 0))
+            return filename, line, phase
+
+        stats = {}
+        for phase, (calls, total, own) in self.stats.items():
+            stats[key(phase)] = (calls, calls, own, total, {})
+        for (phase, caller), (calls, total, own) in self.callers.items():
+            stats[key(phase)][4][key(caller)] = (calls, calls, own, total)
+        with open(path, "wb") as f:
+            marshal.dump(stats, f)
+
+    def dump(self, prefix):
+        """Print the summary and write prefix.trace.json and prefix.pstats."""
+        print(self.summary())
+        self.write_chrome_trace(f"{prefix}.trace.json")
+        self.write_pstats(f"{prefix}.pstats")
+        print(f"Saved {prefix}.trace.json and {prefix}.pstats")
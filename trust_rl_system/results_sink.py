@@ -0,0 +1,124 @@
+import csv
+import numpy as np
+
+RESULT_COLUMNS = ("agent", "total_wealth", "num_cooperate", "num_defect", "num_abstain",
+                  "opponent", "rl_variant")
+NUMERIC_COLUMNS = ("total_wealth", "num_cooperate", "num_defect", "num_abstain")
+
+
+class GroupedMeans:
+    """Running per-group sums and counts, enough to give groupby(keys).mean() without the rows."""
+    def __init__(self, keys, values):
+        self.keys = tuple(keys)
+        self.values = tuple(values)
+        self.sums = {}
+        self.counts = {}
+
+    def add(self, row):
+        group = tuple(row[k] for k in self.keys)
+        sums = self.sums.get(group)
+        if sums is None:
+            sums = self.sums[group] = [0] * len(self.values)
+            self.counts[group] = 0
+        for i, v in enumerate(self.values):
+            sums[i] += row[v]
+        self.counts[group] += 1
+
+    def means(self):
+        """DataFrame of means indexed by the group keys, like groupby(keys)[values].mean()."""
+        import pandas as pd
+        groups = sorted(self.sums)
+        index = pd.MultiIndex.from_tuples(groups, names=self.keys)
+        data = [[s / self.counts[g] for s in self.sums[g]] for g in groups]
+        return pd.DataFrame(data, index=index, columns=list(self.values))
+
+    def pivot(self, value):
+        """means()[value] unstacked: first key down the rows, second across the columns."""
+        if not self.sums:
+            import pandas as pd
+            return pd.DataFrame()
+        return self.means()[value].unstack().fillna(0)
+
+
+class ResultsSink:
+    """Append-only sink for Phase3Simulator rows.
+
+    Rows land in preallocated column buffers (int64 for the counts, object
+    for the names) that are flushed to a CSV file in chunks when path is
+    set, or grown geometrically when kept in memory. The RLAgent1 means by
+    (rl_variant, opponent) used for the plots are updated as rows arrive,
+    so the full table is never needed to draw them.
+    """
+    def __init__(self, path=None, columns=RESULT_COLUMNS, chunk_rows=4096, agent="RLAgent1"):
+        self.path = path
+        self.columns = tuple(columns)
+        self.chunk_rows = chunk_rows
+        self.agent = agent
+        self.buffers = {c: self._empty(c, chunk_rows) for c in self.columns}
+        self.buffered = 0
+        self.rows = 0
+        self.aggregates = GroupedMeans(("rl_variant", "opponent"), NUMERIC_COLUMNS)
+        self._file = None
+        self._writer = None
+        if path is not None:
+            self._file = open(path, "w", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.columns)
+
+    @staticmethod
+    def _empty(column, rows):
+        return np.zeros(rows, dtype=np.int64 if column in NUMERIC_COLUMNS else object)
+
+    def append(self, row):
+        if self.buffered == len(self.buffers[self.columns[0]]):
+            if self._writer is not None:
+                self.flush()
+            else:
+                self._grow()
+        for c in self.columns:
+            self.buffers[c][self.buffered] = row[c]
+        self.buffered += 1
+        self.rows += 1
+        if row["agent"] == self.agent:
+            self.aggregates.add(row)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def _grow(self):
+        for c in self.columns:
+            grown = self._empty(c, 2 * len(self.buffers[c]))
+            grown[:self.buffered] = self.buffers[c]
+            self.buffers[c] = grown
+
+    def flush(self):
+        if self._writer is None or not self.buffered:
+            return
+        self._writer.writerows(zip(*(self.buffers[c][:self.buffered].tolist() for c in self.columns)))
+        self._file.flush()
+        self.buffered = 0
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def to_frame(self):
+        """All rows as a DataFrame (read back from path if the sink streams to disk)."""
+        import pandas as pd
+        if self.path is not None:
+            self.flush()
+            return pd.read_csv(self.path)
+        return pd.DataFrame({c: self.buffers[c][:self.buffered] for c in self.columns})
+
+    def __len__(self):
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,195 @@
+from array import array
+from collections import deque
+from collections.abc import MutableSequence
+
+
+class HistoryStats:
+    """Running statistics over a move history, updated in O(1) per move."""
+    __slots__ = ("counts", "recent", "last", "streak")
+
+    def __init__(self, moves=(), window=5):
+        self.counts = {}                     # move -> number of times played
+        self.recent = deque(maxlen=window)   # last `window` moves
+        self.last = None                     # most recent move
+        self.streak = 0                      # length of the current run of `last`
+        for move in moves:
+            self.push(move)
+
+    def push(self, move):
+        self.counts[move] = self.counts.get(move, 0) + 1
+        self.recent.append(move)
+        if move == self.last:
+            self.streak += 1
+        else:
+            self.last = move
+            self.streak = 1
+
+    def count(self, move):
+        return self.counts.get(move, 0)
+
+    @property
+    def ever_defected(self):
+        return self.counts.get('D', 0) > 0
+
+    def last_moves(self, k):
+        """Last k moves (k must not exceed the window size)."""
+        if k > self.recent.maxlen:
+            raise ValueError(f"k={k} is larger than the tracked window ({self.recent.maxlen})")
+        if k <= 0:
+            return []
+        return list(self.recent)[-k:]
+
+
+class MoveHistory(list):
+    """List of moves that keeps a HistoryStats up to date as moves are appended.
+
+    count() and `in` read the running counts, so strategies written against
+    plain lists (opponent_history.count('D'), 'D' in opponent_history) become
+    O(1) without changing their (history, opponent_history) signature.
+    """
+    def __init__(self, moves=(), window=5):
+        super().__init__(moves)
+        self.stats = HistoryStats(self, window)
+
+    def append(self, move):
+        super().append(move)
+        self.stats.push(move)
+
+    def extend(self, moves):
+        for move in moves:
+            self.append(move)
+
+    def __iadd__(self, moves):
+        self.extend(moves)
+        return self
+
+    def count(self, move):
+        return self.stats.counts.get(move, 0) if isinstance(move, str) else super().count(move)
+
+    def __contains__(self, move):
+        return self.stats.counts.get(move, 0) > 0 if isinstance(move, str) else super().__contains__(move)
+
+    def __reduce__(self):
+        return (self.__class__, (list(self), self.stats.recent.maxlen))
+
+    def _rebuild(self):
+        self.stats = HistoryStats(self, self.stats.recent.maxlen)
+
+    # Anything other than appending rewrites the past, so recount from scratch
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._rebuild()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._rebuild()
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._rebuild()
+        return self
+
+    def insert(self, index, move):
+        super().insert(index, move)
+        self._rebuild()
+
+    def pop(self, index=-1):
+        move = super().pop(index)
+        self._rebuild()
+        return move
+
+    def remove(self, move):
+        super().remove(move)
+        self._rebuild()
+
+    def clear(self):
+        super().clear()
+        self._rebuild()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._rebuild()
+
+    def reverse(self):
+        super().reverse()
+        self._rebuild()
+
+
+# Integer codes for compact storage (same order as vectorized_tournament.ACTIONS)
+MOVES = ('C', 'D', 'A')
+MOVE_CODES = {move: code for code, move in enumerate(MOVES)}
+
+
+class CompactMoveHistory(MutableSequence):
+    """Move history stored as one signed byte per move in an array('b').
+
+    Reads back as 'C'/'D'/'A' strings (slices give plain lists), so strategy
+    functions see the same thing as with a list, at roughly 1/8 of the
+    memory of a list of string references.
+    """
+    def __init__(self, moves=(), window=5):
+        self.codes = array('b')
+        self.stats = HistoryStats((), window)
+        for move in moves:
+            self.append(move)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [MOVES[c] for c in self.codes[index]]
+        return MOVES[self.codes[index]]
+
+    def __iter__(self):
+        return (MOVES[c] for c in self.codes)
+
+    def __eq__(self, other):
+        if isinstance(other, CompactMoveHistory):
+            return self.codes == other.codes
+        return list(self) == other
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+    def __reduce__(self):
+        return (self.__class__, (list(self), self.stats.recent.maxlen))
+
+    def append(self, move):
+        self.codes.append(MOVE_CODES[move])
+        self.stats.push(move)
+
+    def extend(self, moves):
+        for move in moves:
+            self.append(move)
+
+    def count(self, move):
+        return self.stats.counts.get(move, 0)
+
+    def __contains__(self, move):
+        return self.stats.counts.get(move, 0) > 0
+
+    def _rebuild(self):
+        self.stats = HistoryStats(self, self.stats.recent.maxlen)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self.codes[index] = array('b', (MOVE_CODES[m] for m in value))
+        else:
+            self.codes[index] = MOVE_CODES[value]
+        self._rebuild()
+
+    def __delitem__(self, index):
+        del self.codes[index]
+        self._rebuild()
+
+    def insert(self, index, move):
+        self.codes.insert(index, MOVE_CODES[move])
+        self._rebuild()
+
+
+def history_stats(history, window=5):
+    """O(1) stats for a MoveHistory; plain lists are scanned once (O(n))."""
+    if isinstance(history, (MoveHistory, CompactMoveHistory)):
+        return history.stats
+    return HistoryStats(history, window)
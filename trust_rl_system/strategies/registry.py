@@ -0,0 +1,20 @@
+from strategies import (
+    deterministic_strategies,
+    deceptive_strategies,
+    probing_strategies,
+    evolutionary_strategies,
+    group_aware_strategies,
+)
+
+# Strategies whose move is a pure function of (history, opponent_history):
+# they never call random, so the same histories always give the same move.
+DETERMINISTIC_STRATEGIES = frozenset(
+    deterministic_strategies.all_strategies
+    + probing_strategies.all_strategies
+    + evolutionary_strategies.all_strategies
+    + group_aware_strategies.all_strategies
+    + [s for s in deceptive_strategies.all_strategies if s is not deceptive_strategies.sneak_attack]
+)
+
+def is_deterministic(strategy_fn):
+    return strategy_fn in DETERMINISTIC_STRATEGIES
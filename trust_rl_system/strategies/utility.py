@@ -1,13 +1,93 @@
-import matplotlib.pyplot as plt
-import pandas as pd
-import numpy as np
 import os
+from concurrent.futures import ProcessPoolExecutor
 
-def plot_wealth_over_time(wealth_history):
-    plt.figure(figsize=(16, 9))  # Larger figure size
+# matplotlib, pandas and NumPy are imported inside the plotting functions so
+# that importing this module (and running a tournament) does not load them.
 
-    for name, history in wealth_history.items():
-        plt.plot(history, label=name)
+# Figures kept open by name and redrawn in place in headless mode
+_FIGURES = {}
+
+
+def use_headless():
+    """Switch matplotlib to the non-interactive Agg backend (nothing ever blocks on show)."""
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+
+
+def _figure(key, figsize):
+    """Reusable figure: the one drawn under `key` before, cleared, or a new one."""
+    import matplotlib.pyplot as plt
+    fig = _FIGURES.get(key)
+    if fig is None or not plt.fignum_exists(fig.number):
+        fig = _FIGURES[key] = plt.figure(figsize=figsize)
+    else:
+        fig.clf()
+        fig.set_size_inches(figsize)
+    plt.figure(fig.number)
+    return fig
+
+
+def decimate_minmax(values, max_points):
+    """(x, y) of a trajectory reduced to about max_points points.
+
+    The series is cut into max_points // 2 buckets and each keeps its minimum
+    and maximum in their original order, so spikes survive the downsampling.
+    """
+    import numpy as np
+    y = np.asarray(values)
+    n = len(y)
+    if max_points is None or n <= max_points:
+        return np.arange(n), y
+    buckets = max(max_points // 2, 1)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    lo = np.minimum.reduceat(y, starts)
+    hi = np.maximum.reduceat(y, starts)
+    # Index of each bucket's extremes (first occurrence within the bucket)
+    x = []
+    for b, start in enumerate(starts):
+        segment = y[start:edges[b + 1]]
+        i_lo = start + int(np.argmax(segment == lo[b]))
+        i_hi = start + int(np.argmax(segment == hi[b]))
+        x.extend(sorted({i_lo, i_hi}))
+    x = np.asarray(x)
+    return x, y[x]
+
+
+def _wealth_trajectories(wealth_history):
+    """Accept a {name: trajectory} mapping or the path of a streamed .npy wealth file."""
+    if isinstance(wealth_history, (str, os.PathLike)):
+        from wealth_history import load_wealth_history
+        return load_wealth_history(wealth_history)  # memory-mapped, read lazily
+    return wealth_history
+
+
+def _decimated(wealth_history, max_points):
+    """{name: (x, y)} ready to plot, each trajectory reduced to max_points."""
+    return {name: decimate_minmax(history, max_points)
+            for name, history in _wealth_trajectories(wealth_history).items()}
+
+
+def plot_wealth_over_time(wealth_history, path=None, max_points=None, dpi=None):
+    """Plot every agent's wealth trajectory.
+
+    Shows the figure interactively by default; with path, saves it there
+    instead, redrawing one reused figure. max_points caps the points drawn
+    per trajectory (min/max decimation).
+    """
+    render_wealth(_decimated(wealth_history, max_points), path, dpi)
+
+
+def render_wealth(points, path=None, dpi=None):
+    """Draw {name: (x, y)} wealth trajectories; show them, or save to path."""
+    import matplotlib.pyplot as plt
+    if path is None:
+        plt.figure(figsize=(16, 9))  # Larger figure size
+    else:
+        _figure("wealth_over_time", (16, 9))
+
+    for name, (x, y) in points.items():
+        plt.plot(x, y, label=name)
 
     plt.xlabel("Number of Interactions", fontsize=14)
     plt.ylabel("Cumulative Wealth", fontsize=14)
@@ -17,37 +97,54 @@ def plot_wealth_over_time(wealth_history):
     plt.legend(fontsize=10, loc='upper left', bbox_to_anchor=(1, 1))
     plt.grid(True)
     plt.tight_layout()  # Prevent clipping of labels and legend
-    plt.show()
+    if path is None:
+        plt.show()
+    else:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        plt.savefig(path, dpi=dpi)
 
 
-def plot_tournament_results(env):  
+def plot_tournament_results(env, wealth_history=None, out_dir="results", max_points=None, dpi=None):
+    """Save the score bar chart and matchup heatmap; if wealth_history (a mapping or a
+    streamed .npy path, e.g. env.wealth_path) is given, also save the wealth trajectories."""
     scores = {agent.name: agent.wealth for agent in env.agents}
+    points = None if wealth_history is None else _decimated(wealth_history, max_points)
+    render_tournament_results(scores, env.match_scores, points, out_dir, dpi)
+
 
-    if not os.path.exists("results"):
-        os.makedirs("results")
+def render_tournament_results(scores, match_scores, wealth_points=None, out_dir="results", dpi=None):
+    """plot_tournament_results from plain data ({name: (x, y)} wealth points),
+    so it can run in a PlotWorker."""
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import pandas as pd
 
-    plt.figure(figsize=(12, 25))  
+    if not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+
+    _figure("total_scores", (12, 25))
     plt.barh(list(scores.keys()), list(scores.values()))
     plt.title("Total Scores")
     plt.tight_layout()
-    plt.savefig("results/total_scores_bar.png")
-    plt.clf()
+    plt.savefig(os.path.join(out_dir, "total_scores_bar.png"), dpi=dpi)
 
-    agent_names = [agent.name for agent in env.agents]
+    agent_names = list(scores)
     n = len(agent_names)
 
     heatmap_data = np.zeros((n, n))
     name_to_index = {name: idx for idx, name in enumerate(agent_names)}
 
-    for (player_name, opponent_name), score in env.match_scores.items():
+    for (player_name, opponent_name), score in match_scores.items():
         i = name_to_index[player_name]
         j = name_to_index[opponent_name]
         heatmap_data[i][j] = score
 
     df = pd.DataFrame(heatmap_data, index=agent_names, columns=agent_names)
 
-    fig, ax = plt.subplots(figsize=(14, 12)) 
-    cax = ax.matshow(df.values, cmap='coolwarm') 
+    fig = _figure("heatmap_scores", (14, 12))
+    ax = fig.add_subplot()
+    cax = ax.matshow(df.values, cmap='coolwarm')
 
     ax.set_xticks(range(n))
     ax.set_yticks(range(n))
@@ -56,5 +153,54 @@ def plot_tournament_results(env):
     plt.title("Matchup Heatmap (Score per Match)", pad=20)
     plt.colorbar(cax)
     plt.tight_layout()
-    plt.savefig("results/heatmap_scores.png")
-    plt.clf() 
+    plt.savefig(os.path.join(out_dir, "heatmap_scores.png"), dpi=dpi)
+
+    if wealth_points is not None:
+        _figure("wealth_over_time_recordings", (16, 9))
+        for name, (x, y) in wealth_points.items():
+            plt.plot(x, y, label=name)
+        plt.xlabel("Number of Recordings")
+        plt.ylabel("Cumulative Wealth")
+        plt.title("Agent Wealth Over Time")
+        plt.legend(fontsize=6, loc='upper left', bbox_to_anchor=(1, 1))
+        plt.tight_layout()
+        plt.savefig(os.path.join(out_dir, "wealth_over_time.png"), dpi=dpi)
+
+
+class PlotWorker:
+    """Renders figures in a separate headless process while the simulation carries on.
+
+    Trajectories are decimated to max_points before they are sent, so only
+    the points that will be drawn cross the process boundary. The worker
+    keeps its figures open and redraws them for every submission.
+    """
+    def __init__(self, max_points=2000, dpi=100):
+        self.max_points = max_points
+        self.dpi = dpi
+        self.pool = ProcessPoolExecutor(max_workers=1, initializer=use_headless)
+        self.futures = []
+
+    def wealth_over_time(self, wealth_history, path):
+        points = _decimated(wealth_history, self.max_points)
+        self.futures.append(self.pool.submit(render_wealth, points, path, self.dpi))
+
+    def tournament_results(self, env, wealth_history=None, out_dir="results"):
+        scores = {agent.name: agent.wealth for agent in env.agents}
+        points = None if wealth_history is None else _decimated(wealth_history, self.max_points)
+        self.futures.append(self.pool.submit(
+            render_tournament_results, scores, dict(env.match_scores), points, out_dir, self.dpi))
+
+    def close(self):
+        """Wait for every queued figure and re-raise the first rendering error."""
+        try:
+            for future in self.futures:
+                future.result()
+        finally:
+            self.pool.shutdown()
+            self.futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from GameSetup import Agent
+from Monte_Carlo import MCTS
+from strategies.deterministic_strategies import tit_for_tat
+
+
+def _state():
+    return (Agent("RL", trust_model=1), Agent("opp", strategy_fn=tit_for_tat), [])
+
+
+def test_node_budget_alone_is_rejected():
+    with pytest.raises(ValueError):
+        MCTS(["C", "D"], max_depth=3).run_anytime(_state(), node_budget=10**6)
+
+
+@pytest.mark.parametrize("limit", [{"max_simulations": 2_000}, {"time_budget": 0.2}])
+def test_oversized_node_budget_stops_at_the_other_limit(limit):
+    random.seed(0)
+    best, stats = MCTS(["C", "D"], max_depth=3).run_anytime(_state(), node_budget=10**6, **limit)
+    assert best is not None
+    assert stats["tree_size"] <= 15
+    if "max_simulations" in limit:
+        assert stats["simulations"] == 2_000
+
+
+def test_complete_tree_ends_the_search_early():
+    mcts = MCTS(["C", "D", "A"], max_depth=1)
+    random.seed(0)
+    _, stats = mcts.run_anytime(_state(), node_budget=10**6, max_simulations=10**6)
+    # Root plus its three children is the whole depth-1 tree
+    assert stats["fully_expanded"]
+    assert stats["tree_size"] == 4
+    assert stats["simulations"] < 100
@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from GameSetup import Agent
+from array_mcts import ArrayMCTS
+from strategies.deterministic_strategies import tit_for_tat
+from strategies.stochastic_strategies import noisy_tft
+
+ACTIONS = ["C", "D", "A"]
+
+
+@pytest.mark.parametrize("strategy", [tit_for_tat, noisy_tft])
+def test_lockstep_trees_spend_every_simulation(strategy):
+    mcts = ArrayMCTS(ACTIONS, simulations=500, max_depth=4, trees=16)
+    random.seed(0)
+    action = mcts.run((Agent("RL", trust_model=1), Agent("opp", strategy_fn=strategy), []))
+    assert action in ACTIONS
+    # ceil(500 / 16) simulations in each of the 16 trees, merged at the root
+    assert sum(visits for visits, _ in mcts.root_stats.values()) == 16 * 32
+    nodes = mcts.node_arrays()
+    roots = nodes["parent"][::len(nodes["parent"]) // 16]
+    assert (roots == -1).all()
+    assert nodes["depth"].max() <= 4
+
+
+def test_lockstep_replies_follow_the_opponent_strategy():
+    mcts = ArrayMCTS(ACTIONS, simulations=300, max_depth=3, trees=8)
+    random.seed(1)
+    mcts.run((Agent("RL", trust_model=1), Agent("opp", strategy_fn=tit_for_tat), [("D", "C")]))
+    nodes = mcts.node_arrays()
+    checked = 0
+    for node, parent in enumerate(nodes["parent"]):
+        if parent < 0:  # a root or an unexpanded slot
+            continue
+        # tit_for_tat answers our previous move: the parent edge's action, or the root history's "D"
+        expected = nodes["action"][parent] if nodes["parent"][parent] >= 0 else ACTIONS.index("D")
+        assert nodes["opp_action"][node] == expected
+        checked += 1
+    assert checked > 8 * 3
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from GameSetup import Agent, PAYOFFS
+from Monte_Carlo import MCTS
+from best_response import ACTIONS, BestResponseSolver, solve_machine
+from strategies.deterministic_strategies import grim_trigger, tit_for_tat
+
+ROUNDS = 8
+
+
+def _play(choose, strategy):
+    """Our total payoff over ROUNDS rounds against strategy; choose(own, opp, rounds_left) picks our move."""
+    own, opp, total = [], [], 0
+    for r in range(ROUNDS):
+        move = choose(own, opp, ROUNDS - r)
+        reply = strategy(opp, own)
+        total += PAYOFFS[(move, reply)][0]
+        own.append(move)
+        opp.append(reply)
+    return total
+
+
+@pytest.mark.parametrize("strategy", [tit_for_tat, grim_trigger])
+def test_best_response_beats_or_equals_mcts(strategy):
+    solver = BestResponseSolver()
+    responder = solver.responder(strategy, ROUNDS)
+
+    def best(own, opp, rounds_left):
+        if own:
+            responder.observe(own[-1], opp[-1])
+        assert responder.valid
+        return responder.act(rounds_left)
+
+    me, opponent = Agent("RL", trust_model=1), Agent("opp", strategy_fn=strategy)
+    mcts = MCTS(list(ACTIONS), simulations=300, max_depth=4, reuse_tree=True)
+
+    def searched(own, opp, rounds_left):
+        return mcts.run((me, opponent, list(zip(own, opp)))).action
+
+    optimum = solve_machine(solver.machine(strategy, ROUNDS), ROUNDS)[1][ROUNDS][0]
+    assert _play(best, strategy) == optimum
+    for seed in range(3):
+        random.seed(seed)
+        assert _play(searched, strategy) <= optimum
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+import torch
+
+from GameSetup import Agent
+from compiled_gnn import CompiledGNN, export, load_eager
+from phase_3_mcts_simulation import Phase3Simulator, build_rl_agents
+from strategies.deterministic_strategies import tit_for_tat
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    """A compiled GCN with fresh random weights (unlike saved_models/trust_gnn.pth), and its eager model."""
+    torch.manual_seed(0)
+    model = load_eager("gcn", weights=None)
+    path = str(tmp_path / "gcn.ts")
+    export(model, path)
+    return path, model
+
+
+def test_compiled_artifact_scores_the_leaves(artifact):
+    path, model = artifact
+    agent, mcts, _, _ = build_rl_agents(compiled=path)
+    assert isinstance(mcts.gnn_model, CompiledGNN)
+    state = (agent, Agent("opp", strategy_fn=tit_for_tat), [])
+    expected = model(mcts.build_graph_fn(mcts.leaf_features(state), mcts.EDGES)).mean().item()
+    assert mcts.rollout(state) == pytest.approx(expected, abs=1e-5)
+
+
+def test_phase3_moves_are_searched_with_the_model(artifact):
+    agent, mcts, _, opponent_mcts = build_rl_agents(compiled=artifact[0])
+    scorer, calls = mcts.gnn_model, []
+
+    def counting(graph):
+        calls.append(graph)
+        return scorer(graph)
+    mcts.gnn_model = counting
+    random.seed(0)
+    sim = Phase3Simulator(agent, Agent("tit_for_tat", strategy_fn=tit_for_tat), mcts, opponent_mcts,
+                          num_episodes=1, max_rounds=2)
+    row = next(sim.iter_results())
+    assert row["num_cooperate"] + row["num_defect"] + row["num_abstain"] == 2
+    assert len(calls) == 2 * mcts.simulations
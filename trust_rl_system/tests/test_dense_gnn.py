@@ -0,0 +1,43 @@
+import pytest
+import torch
+from torch_geometric.data import Batch
+
+from GameSetup import Agent
+from GAT import build_trust_graph
+from Monte_Carlo import MCTSWithLearningModel
+from compiled_gnn import load_eager
+from dense_gnn import DenseGATScorer, DenseGCNScorer
+from transposition import TranspositionTable
+
+EDGES = [(0, 1), (1, 0)]
+
+
+def _features(size=32):
+    generator = torch.Generator().manual_seed(0)
+    return torch.rand(size, 2, 5, generator=generator) * torch.tensor([1, 100, 1, 1, 1])
+
+
+@pytest.mark.parametrize("kind, scorer_cls", [("gcn", DenseGCNScorer), ("gat", DenseGATScorer)])
+def test_dense_scorer_matches_the_pyg_model(kind, scorer_cls):
+    torch.manual_seed(0)
+    model = load_eager(kind, weights=None)
+    features = _features()
+    batch = Batch.from_data_list([build_trust_graph(f.tolist(), EDGES) for f in features])
+    with torch.inference_mode():
+        expected = model(batch)
+        dense = scorer_cls.from_model(model)
+        assert torch.allclose(dense(features).reshape(-1, 2), expected, atol=1e-5)
+    per_graph = expected.reshape(-1, 4).mean(dim=1).tolist()
+    assert dense.values(features) == pytest.approx(per_graph, abs=1e-5)
+
+
+def test_single_leaf_dense_scores_are_cached():
+    torch.manual_seed(0)
+    table = TranspositionTable()
+    scorer = DenseGCNScorer.from_model(load_eager("gcn", weights=None))
+    mcts = MCTSWithLearningModel(["C", "D", "A"], dense_scorer=scorer, transposition_table=table)
+    state = (Agent("RL", trust_model=1), Agent("opp", trust_model=1), [])
+    value = mcts.rollout(state)
+    assert len(table) == 1
+    assert mcts.rollout(state) == value
+    assert table.hits == 1
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from GameSetup import Agent, Environment
+from strategies.history import CompactMoveHistory, MoveHistory
+from tournament_runner import ALL_OPPONENTS
+
+TRUST_MODELS = {"PersonalTrust": 1, "TRAVOSTrust": 2, "HearsayTrust": 3,
+                "DefectiveAgent": 4, "AdversaryAgent": 5}
+
+
+def _moves(rng, n):
+    return [rng.choice("CDA") for _ in range(n)]
+
+
+@pytest.mark.parametrize("history_cls", [MoveHistory, CompactMoveHistory])
+def test_history_reads_like_a_list(history_cls):
+    rng = random.Random(0)
+    moves = _moves(rng, 50)
+    history = history_cls(moves[:30])
+    history.extend(moves[30:])
+    assert history == moves and list(history) == moves
+    assert history[-5:] == moves[-5:] and history[7] == moves[7]
+    assert [history.count(m) for m in "CDA"] == [moves.count(m) for m in "CDA"]
+    # Rewriting the past recounts
+    history[0] = moves[0] = "D"
+    del history[3]
+    del moves[3]
+    history.insert(5, "A")
+    moves.insert(5, "A")
+    assert history == moves
+    assert [history.count(m) for m in "CDA"] == [moves.count(m) for m in "CDA"]
+    assert ("D" in history) == ("D" in moves)
+
+
+@pytest.mark.parametrize("length", [0, 1, 10, 200])
+def test_strategies_see_compact_histories_as_lists(length):
+    rng = random.Random(length)
+    own, opp = _moves(rng, length), _moves(rng, length)
+    for fn in ALL_OPPONENTS:
+        random.seed(1)
+        expected = fn(list(own), list(opp))
+        random.seed(1)
+        assert fn(CompactMoveHistory(own), CompactMoveHistory(opp)) == expected, fn.__name__
+
+
+def test_compact_tournament_matches_list_tournament():
+    results = []
+    for compact in (False, True):
+        random.seed(0)
+        agents = [Agent(name, trust_model=model) for name, model in TRUST_MODELS.items()]
+        agents += [Agent(fn.__name__, strategy_fn=fn) for fn in ALL_OPPONENTS]
+        env = Environment(agents, rounds=6, compact=compact)
+        env.run()
+        results.append(({name: list(w) for name, w in env.wealth_history.items()}, env.match_scores,
+                        {a.name: dict(a.trust) for a in agents}))
+    assert results[0] == results[1]
@@ -0,0 +1,34 @@
+import random
+
+import pytest
+import torch
+
+from GameSetup import Agent
+from GAT import build_trust_graph
+from Monte_Carlo import MCTSWithLearningModel
+from compiled_gnn import load_eager
+
+
+def _leaf_states(n=12):
+    rng = random.Random(0)
+    states = []
+    for k in range(n):
+        agent = Agent("RL", trust_model=1, trust={"opp": rng.random()}, wealth=rng.randint(-20, 40))
+        opponent = Agent("opp", trust_model=1, trust={"RL": rng.random()}, wealth=rng.randint(-20, 40))
+        states.append((agent, opponent, [("C", "D")] * (k % 3)))
+    return states
+
+
+@pytest.mark.parametrize("kind", ["gcn", "gat"])
+def test_batched_leaves_match_single_rollouts(kind):
+    torch.manual_seed(0)
+    model = load_eager(kind, weights=None)
+    mcts = MCTSWithLearningModel(["C", "D", "A"], gnn_model=model,
+                                 build_graph_fn=build_trust_graph, leaf_batch_size=8)
+    states = _leaf_states()
+    with torch.inference_mode():
+        single = [mcts.rollout(state) for state in states]
+        # Both paths fall back to random rollouts if the model fails, so pin them to the model
+        expected = [model(build_trust_graph(mcts.leaf_features(s), mcts.EDGES)).mean().item() for s in states]
+    assert single == pytest.approx(expected, abs=1e-6)
+    assert mcts.evaluate_leaves(states) == pytest.approx(single, abs=1e-5)
@@ -0,0 +1,38 @@
+import pytest
+
+import best_response
+from GameSetup import PAYOFFS
+from markov_payoffs import MarkovPayoffEngine
+from strategies.deterministic_strategies import grudger, tit_for_tat, win_stay_lose_shift
+
+
+def _play(strategy1, strategy2, rounds):
+    """Total payoffs of a pairwise match in which both sides see the moves so far."""
+    own1, own2, score1, score2 = [], [], 0, 0
+    for _ in range(rounds):
+        a1, a2 = strategy1(own1, own2), strategy2(own2, own1)
+        p1, p2 = PAYOFFS[(a1, a2)]
+        score1, score2 = score1 + p1, score2 + p2
+        own1.append(a1)
+        own2.append(a2)
+    return score1, score2
+
+
+def _defect_after_50(history, opponent_history):
+    return "C" if len(history) < 50 else "D"
+
+
+@pytest.mark.parametrize("pair", [(tit_for_tat, grudger), (win_stay_lose_shift, tit_for_tat)])
+def test_expected_payoffs_match_a_played_match(pair):
+    engine = MarkovPayoffEngine()
+    assert engine.expected_payoffs(*pair, 45) == pytest.approx(_play(*pair, 45))
+
+
+def test_matches_longer_than_the_probe_are_reprobed(monkeypatch):
+    # A counter past probe_length looks like always_cooperate to a 40-move probe
+    monkeypatch.setattr(best_response, "is_deterministic", lambda strategy_fn: True)
+    engine = MarkovPayoffEngine(probe_length=40)
+    assert engine.expected_payoffs(_defect_after_50, tit_for_tat, 30) == pytest.approx(
+        _play(_defect_after_50, tit_for_tat, 30))
+    assert engine.expected_payoffs(_defect_after_50, tit_for_tat, 60) == pytest.approx(
+        _play(_defect_after_50, tit_for_tat, 60))
@@ -0,0 +1,16 @@
+import pandas as pd
+
+from strategies.deterministic_strategies import grudger, tit_for_tat
+from tournament_runner import run_sweep
+
+SWEEP = dict(trust_models=[1], opponents=[tit_for_tat, grudger], workers=1, num_episodes=2, max_rounds=2)
+
+
+def test_warm_sweep_matches_uncached(tmp_path, capsys):
+    path = str(tmp_path / "matches.sqlite")
+    uncached = run_sweep(**SWEEP)
+    cold = run_sweep(cache_path=path, **SWEEP)
+    warm = run_sweep(cache_path=path, **SWEEP)
+    assert "2 of 2 matches loaded" in capsys.readouterr().out
+    pd.testing.assert_frame_equal(cold, uncached)
+    pd.testing.assert_frame_equal(warm, uncached)
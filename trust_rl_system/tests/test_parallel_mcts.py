@@ -0,0 +1,36 @@
+import pytest
+
+from GameSetup import Agent
+from Monte_Carlo import MCTS
+from parallel_mcts import LeafParallelMCTS, RootParallelMCTS
+from strategies.deterministic_strategies import tit_for_tat
+from strategies.stochastic_strategies import noisy_tft
+
+ACTIONS = ["C", "D", "A"]
+
+
+def _players(strategy):
+    return Agent("RL", trust_model=1), Agent("opp", strategy_fn=strategy)
+
+
+def _root_parallel(workers, strategy):
+    with RootParallelMCTS(MCTS(ACTIONS, simulations=120, max_depth=4), workers=workers, trees=4, seed=7) as mcts:
+        action = mcts.select_action(*_players(strategy))
+        return action, mcts.root_stats
+
+
+@pytest.mark.parametrize("strategy", [tit_for_tat, noisy_tft])
+def test_root_parallel_is_valid_and_independent_of_workers(strategy):
+    action, stats = _root_parallel(2, strategy)
+    assert action in ACTIONS
+    assert set(stats) == set(ACTIONS)
+    assert sum(visits for visits, _ in stats.values()) == 120
+    assert _root_parallel(1, strategy) == (action, stats)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_leaf_parallel_returns_valid_actions(executor):
+    mcts = MCTS(ACTIONS, simulations=60, max_depth=4)
+    with LeafParallelMCTS(mcts, workers=2, batch_size=8, executor=executor, seed=3) as leaf:
+        for strategy in (tit_for_tat, noisy_tft):
+            assert leaf.select_action(*_players(strategy)) in ACTIONS
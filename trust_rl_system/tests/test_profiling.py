@@ -0,0 +1,39 @@
+import random
+
+from GameSetup import Agent, Environment
+from Monte_Carlo import MCTS
+from profiling import Instrumentation, instrumented_methods
+from strategies.deterministic_strategies import tit_for_tat
+from tournament_runner import ALL_OPPONENTS
+
+TRUST_MODELS = {"PersonalTrust": 1, "TRAVOSTrust": 2, "HearsayTrust": 3,
+                "DefectiveAgent": 4, "AdversaryAgent": 5}
+
+
+def tournament():
+    random.seed(0)
+    agents = [Agent(name, trust_model=model) for name, model in TRUST_MODELS.items()]
+    agents += [Agent(fn.__name__, strategy_fn=fn) for fn in ALL_OPPONENTS]
+    env = Environment(agents, rounds=4)
+    env.run()
+    return env.wealth_history, env.match_scores, {a.name: dict(a.trust) for a in agents}
+
+
+def search():
+    random.seed(0)
+    mcts = MCTS(["C", "D", "A"], simulations=200)
+    best = mcts.run((Agent("RL", trust_model=1), Agent("opp", strategy_fn=tit_for_tat), []))
+    return [(c.action, c.visits, c.total_reward) for c in best.parent.children]
+
+
+def test_instrumentation_leaves_results_unchanged(tmp_path):
+    originals = [cls.__dict__[name] for cls, name, _ in instrumented_methods()]
+    expected = tournament(), search()
+    with Instrumentation() as profile:
+        assert (tournament(), search()) == expected
+    assert profile.stats["Environment.play_round"][0] > 0
+    assert profile.stats["MCTS.rollout"][0] > 0
+    profile.dump(str(tmp_path / "run"))
+    # uninstall puts the original methods back
+    assert [cls.__dict__[name] for cls, name, _ in instrumented_methods()] == originals
+    assert (tournament(), search()) == expected
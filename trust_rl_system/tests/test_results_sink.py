@@ -0,0 +1,76 @@
+import random
+
+import pandas as pd
+import pytest
+
+from GameSetup import Agent
+from phase_3_mcts_simulation import Phase3Simulator
+from results_sink import NUMERIC_COLUMNS, ResultsSink
+from strategies.deterministic_strategies import grudger, tit_for_tat
+from strategies.stochastic_strategies import noisy_tft
+
+OPPONENTS = [tit_for_tat, grudger, noisy_tft]
+VARIANTS = {"RL + PersonalTrust": 1, "RL + HearsayTrust": 3}
+
+
+def _simulator(model, strategy):
+    return Phase3Simulator(Agent("RLAgent1", trust_model=model), Agent(strategy.__name__, strategy_fn=strategy),
+                           None, None, num_episodes=3, max_rounds=6)
+
+
+def _legacy_frame(sim):
+    """Phase3Simulator.run as it was before iter_results: one DataFrame built at the end."""
+    data = []
+    for _ in range(sim.num_episodes):
+        sim.agent1.reset()
+        sim.agent2.reset()
+        for _ in range(sim.max_rounds):
+            action1 = sim._decide_with_possible_mcts(sim.agent1, sim.agent2, sim.mcts1)
+            action2 = sim._decide_with_possible_mcts(sim.agent2, sim.agent1, sim.mcts2)
+            payoff1, payoff2 = sim.get_payoff(action1, action2)
+            sim.agent1.wealth += payoff1
+            sim.agent2.wealth += payoff2
+            sim.agent1.history.append(action1)
+            sim.agent2.history.append(action2)
+            sim.agent1.opponent_history.append(action2)
+            sim.agent2.opponent_history.append(action1)
+        data.append({"agent": sim.agent1.name, "total_wealth": sim.agent1.wealth,
+                     "num_cooperate": sim.agent1.history.count("C"),
+                     "num_defect": sim.agent1.history.count("D"),
+                     "num_abstain": sim.agent1.history.count("A")})
+    return pd.DataFrame(data)
+
+
+def _tagged(rows, variant, strategy):
+    for row in rows:
+        row.update(opponent=strategy.__name__, rl_variant=variant)
+    return rows
+
+
+@pytest.mark.parametrize("strategy", OPPONENTS)
+def test_iter_results_rows_equal_the_old_frame(strategy):
+    random.seed(0)
+    expected = _legacy_frame(_simulator(1, strategy))
+    random.seed(0)
+    rows = list(_simulator(1, strategy).iter_results())
+    pd.testing.assert_frame_equal(pd.DataFrame(rows), expected)
+    random.seed(0)
+    pd.testing.assert_frame_equal(_simulator(1, strategy).run(), expected)
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_sink_matches_the_concatenated_frames(tmp_path, streamed):
+    random.seed(1)
+    frames = []
+    with ResultsSink(str(tmp_path / "rows.csv") if streamed else None, chunk_rows=2) as sink:
+        for variant, model in VARIANTS.items():
+            for strategy in OPPONENTS:
+                rows = _tagged(list(_simulator(model, strategy).iter_results()), variant, strategy)
+                frames.append(pd.DataFrame(rows))
+                sink.extend(rows)
+        result = sink.to_frame()
+    expected = pd.concat(frames, ignore_index=True)[list(sink.columns)]
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    means = expected.groupby(["rl_variant", "opponent"])[list(NUMERIC_COLUMNS)].mean()
+    for column in NUMERIC_COLUMNS:
+        pd.testing.assert_frame_equal(sink.aggregates.pivot(column), means[column].unstack().fillna(0))
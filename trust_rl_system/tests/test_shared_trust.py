@@ -0,0 +1,46 @@
+import random
+
+from GameSetup import Agent, Environment
+from tournament_runner import ALL_OPPONENTS
+
+TRUST_MODELS = {"PersonalTrust": 1, "TRAVOSTrust": 2, "HearsayTrust": 3,
+                "DefectiveAgent": 4, "AdversaryAgent": 5}
+
+
+def tournament_agents():
+    agents = [Agent(name, trust_model=model) for name, model in TRUST_MODELS.items()]
+    return agents + [Agent(fn.__name__, strategy_fn=fn) for fn in ALL_OPPONENTS]
+
+
+class CheckedEnvironment(Environment):
+    """Compares the reputation table with the full rescan after every round."""
+    checks = 0
+
+    def after_round(self, round_index, offsets=None):
+        super().after_round(round_index, offsets)
+        assert dict(self.reputation) == self.calculate_shared_trust()
+        self.checks += 1
+
+
+def test_reputation_table_matches_calculate_shared_trust():
+    random.seed(0)
+    env = CheckedEnvironment(tournament_agents(), rounds=10)
+    env.run()
+    assert env.checks > 0
+
+
+def test_reputation_table_matches_after_agent_reuse():
+    # A second tournament starts from the evidence the agents already hold
+    random.seed(1)
+    agents = tournament_agents()
+    Environment(agents[::2], rounds=2).run()
+    env = CheckedEnvironment(agents[::-1], rounds=5)
+    env.run()
+    assert env.checks > 0
+
+
+def test_reputation_table_matches_with_trust_store():
+    random.seed(2)
+    env = CheckedEnvironment(tournament_agents(), rounds=2, trust_store=True)
+    env.run()
+    assert env.checks > 0
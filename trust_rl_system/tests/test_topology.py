@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from GameSetup import Agent, Environment
+from topology import Topology, complete, ring_lattice
+from tournament_runner import ALL_OPPONENTS
+
+TRUST_MODELS = {"PersonalTrust": 1, "TRAVOSTrust": 2, "HearsayTrust": 3,
+                "DefectiveAgent": 4, "AdversaryAgent": 5}
+
+
+def field():
+    agents = [Agent(name, trust_model=model) for name, model in TRUST_MODELS.items()]
+    return agents + [Agent(fn.__name__, strategy_fn=fn) for fn in ALL_OPPONENTS]
+
+
+def outcome(**kwargs):
+    random.seed(0)
+    agents = field()
+    env = Environment(agents, rounds=5, **kwargs)
+    env.run()
+    return (env.wealth_history, env.match_scores, {a.name: dict(a.trust) for a in agents},
+            {a.name: {k: dict(v) for k, v in a.evidence.items()} for a in agents})
+
+
+def test_complete_topology_reproduces_the_round_robin():
+    assert outcome(topology=complete(len(field()))) == outcome()
+
+
+def test_sparse_topology_plays_only_its_edges():
+    n = len(field())
+    lattice = ring_lattice(n, 4)
+    _, match_scores, _, _ = outcome(topology=lattice, record="end")
+    names = [a.name for a in field()]
+    assert {(names[i], names[j]) for i, j in lattice.pairs(0)} == {
+        (a, b) for a, b in match_scores if names.index(a) < names.index(b)}
+
+
+def test_topology_is_abstract():
+    with pytest.raises(TypeError):
+        Topology()
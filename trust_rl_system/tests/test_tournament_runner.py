@@ -0,0 +1,21 @@
+import pandas as pd
+
+from strategies.deterministic_strategies import grudger, tit_for_tat
+from strategies.stochastic_strategies import noisy_tft
+from tournament_runner import match_rows, run_sweep
+from worker_pool import derive_seed
+
+OPPONENTS = [tit_for_tat, grudger, noisy_tft]
+
+
+def test_parallel_sweep_matches_serial_matches():
+    sweep = dict(trust_models=[1, 3], opponents=OPPONENTS, num_episodes=2, max_rounds=2, base_seed=3)
+    parallel = run_sweep(workers=2, **sweep)
+    serial = pd.DataFrame([
+        row
+        for model in (1, 3)
+        for fn in OPPONENTS
+        for row in match_rows(model, fn, derive_seed(3, model, fn.__name__, 0), num_episodes=2, max_rounds=2)
+    ])
+    pd.testing.assert_frame_equal(parallel, serial)
+    pd.testing.assert_frame_equal(run_sweep(workers=1, **sweep), serial)
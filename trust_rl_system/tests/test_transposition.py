@@ -0,0 +1,42 @@
+import random
+
+import pytest
+import torch
+
+from GameSetup import Agent
+from GAT import build_trust_graph
+from Monte_Carlo import MCTS, MCTSWithLearningModel
+from compiled_gnn import load_eager
+from strategies.deterministic_strategies import grudger, tit_for_tat
+from transposition import TranspositionTable
+
+ACTIONS = ["C", "D", "A"]
+
+
+def _root_stats(make_mcts, strategy, table):
+    mcts = make_mcts(table)
+    random.seed(0)
+    best = mcts.run((Agent("RL", trust_model=1), Agent("opp", strategy_fn=strategy), []))
+    return best.action, [(c.action, c.visits, c.total_reward) for c in best.parent.children]
+
+
+def _learning(table):
+    torch.manual_seed(0)
+    return MCTSWithLearningModel(ACTIONS, simulations=200, gnn_model=load_eager("gcn", weights=None),
+                                 build_graph_fn=build_trust_graph, transposition_table=table)
+
+
+def _random_rollouts(table):
+    return MCTS(ACTIONS, simulations=300, transposition_table=table)
+
+
+@pytest.mark.parametrize("make_mcts", [_random_rollouts, _learning], ids=["mcts", "learning_model"])
+@pytest.mark.parametrize("strategy", [tit_for_tat, grudger])
+def test_table_does_not_change_the_search(make_mcts, strategy):
+    table = TranspositionTable()
+    cached = _root_stats(make_mcts, strategy, table)
+    assert table.hits > 0
+    action, stats = _root_stats(make_mcts, strategy, None)
+    assert cached[0] == action
+    assert [s[:2] for s in cached[1]] == [s[:2] for s in stats]
+    assert [s[2] for s in cached[1]] == pytest.approx([s[2] for s in stats])
@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from GameSetup import Agent
+from Monte_Carlo import MCTS, MCTSWithLearningModel, UCTNode
+from strategies.deterministic_strategies import tit_for_tat
+
+ACTIONS = ["C", "D", "A"]
+
+
+def _agents():
+    return Agent("RL", trust_model=1), Agent("opp", strategy_fn=tit_for_tat)
+
+
+@pytest.mark.parametrize("max_tree_nodes", [0, 2, 3])
+def test_budget_below_root_and_children_is_rejected(max_tree_nodes):
+    with pytest.raises(ValueError):
+        MCTS(ACTIONS, reuse_tree=True, max_tree_nodes=max_tree_nodes)
+
+
+def test_smallest_budget_keeps_the_root_children():
+    mcts = MCTSWithLearningModel(ACTIONS, simulations=20, reuse_tree=True, max_tree_nodes=4)
+    agent, opponent = _agents()
+    random.seed(0)
+    for _ in range(3):
+        action = mcts.select_action(agent, opponent)
+        assert action in ACTIONS
+        assert mcts.tree_size == mcts.count_nodes(mcts.root) <= 4
+        assert len(mcts.root.children) == len(ACTIONS)
+        reply = tit_for_tat(list(opponent.history), list(agent.history))
+        agent.history.append(action)
+        opponent.history.append(reply)
+
+
+def test_search_without_simulations_returns_a_node():
+    mcts = MCTS(ACTIONS, simulations=0)
+    best = mcts.run((*_agents(), []))
+    assert isinstance(best, UCTNode) and best.action in ACTIONS
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from GameSetup import Agent, Environment
+from tournament_runner import ALL_OPPONENTS
+
+TRUST_MODELS = {"PersonalTrust": 1, "TRAVOSTrust": 2, "HearsayTrust": 3,
+                "DefectiveAgent": 4, "AdversaryAgent": 5}
+
+
+def field():
+    agents = [Agent(name, trust_model=model) for name, model in TRUST_MODELS.items()]
+    return agents + [Agent(fn.__name__, strategy_fn=fn) for fn in ALL_OPPONENTS]
+
+
+def state(agents):
+    return ({a.name: a.wealth for a in agents},
+            {a.name: dict(a.trust) for a in agents},
+            {a.name: {k: dict(v) for k, v in a.evidence.items()} for a in agents},
+            {a.name: {k: dict(v) for k, v in a.beliefs.items()} for a in agents})
+
+
+def reused(first_store, second_store):
+    """Play a tournament with part of the field, then another with the rest joining."""
+    random.seed(0)
+    agents = field()
+    Environment(agents[::2], rounds=3, trust_store=first_store).run()
+    env = Environment(agents, rounds=3, trust_store=second_store)
+    env.run()
+    return state(agents), env.match_scores
+
+
+def test_store_matches_dict_trust():
+    results = []
+    for trust_store in (False, True):
+        random.seed(0)
+        agents = field()
+        env = Environment(agents, rounds=8, trust_store=trust_store)
+        env.run()
+        results.append((state(agents), env.match_scores))
+    assert results[0] == results[1]
+
+
+@pytest.mark.parametrize("first_store, second_store", [(True, False), (False, True), (True, True)])
+def test_agents_reused_across_environments(first_store, second_store):
+    assert reused(first_store, second_store) == reused(False, False)
+
+
+def test_detached_agents_hold_plain_dicts():
+    agents = field()[:4]
+    Environment(agents, rounds=2, trust_store=True).run()
+    Environment(agents[:2] + [Agent("newcomer", trust_model=1)], rounds=2).run()
+    assert all(type(a.trust) is dict and type(a.evidence) is dict for a in agents[:2])
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from GameSetup import Agent, Environment
+from tournament_runner import ALL_OPPONENTS
+from vectorized_tournament import VectorizedEnvironment
+
+TRUST_MODELS = {"PersonalTrust": 1, "TRAVOSTrust": 2, "HearsayTrust": 3,
+                "DefectiveAgent": 4, "AdversaryAgent": 5}
+
+
+def field(trust_models=TRUST_MODELS):
+    agents = [Agent(name, trust_model=model) for name, model in trust_models.items()]
+    return agents + [Agent(fn.__name__, strategy_fn=fn) for fn in ALL_OPPONENTS]
+
+
+def outcome(env_cls, agents, runs=1, **kwargs):
+    random.seed(0)
+    env = env_cls(agents, rounds=8, **kwargs)
+    for _ in range(runs):
+        env.run()
+    return ({a.name: a.wealth for a in agents}, env.match_scores,
+            {a.name: dict(a.trust) for a in agents},
+            {a.name: {k: dict(v) for k, v in a.evidence.items()} for a in agents},
+            {a.name: {k: dict(v) for k, v in a.beliefs.items()} for a in agents})
+
+
+@pytest.mark.parametrize("trust_models", [TRUST_MODELS, {"PersonalTrust": 1}, {}],
+                         ids=["all_trust_models", "no_shared_trust_readers", "strategies_only"])
+def test_matches_environment_run(trust_models):
+    assert outcome(VectorizedEnvironment, field(trust_models)) == outcome(Environment, field(trust_models))
+
+
+def test_match_scores_accumulate_over_runs():
+    assert outcome(VectorizedEnvironment, field(), runs=2) == outcome(Environment, field(), runs=2)
+
+
+def test_matches_environment_run_with_trust_store():
+    expected = outcome(Environment, field())
+    assert outcome(VectorizedEnvironment, field(), trust_store=True) == expected
+
+
+def test_untracked_evidence_rejects_trust_models():
+    with pytest.raises(ValueError):
+        VectorizedEnvironment(field({"PersonalTrust": 1}), track_evidence=False)
+    # Without trust-model agents only the evidence bookkeeping is skipped
+    expected = outcome(Environment, field({}))
+    assert outcome(VectorizedEnvironment, field({}), track_evidence=False)[:2] == expected[:2]
+
+
+def test_rejects_history_changes():
+    class Recording(VectorizedEnvironment):
+        def play_round(self, agent1, agent2):
+            action1, action2 = super().play_round(agent1, agent2)
+            agent1.history.append(action1)
+            agent2.history.append(action2)
+            return action1, action2
+
+    # noisy_tft is stochastic, so its pairs fall back to play_round
+    agents = [Agent(fn.__name__, strategy_fn=fn) for fn in ALL_OPPONENTS]
+    with pytest.raises(RuntimeError):
+        Recording(agents, rounds=2).run()
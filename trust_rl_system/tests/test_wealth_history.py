@@ -0,0 +1,47 @@
+import random
+
+import numpy as np
+import pytest
+
+from GameSetup import Agent, Environment
+from strategies.deterministic_strategies import all_strategies
+from vectorized_tournament import VectorizedEnvironment
+from wealth_history import NpyWealthWriter, load_wealth_history
+
+
+def strategy_agents():
+    return [Agent(fn.__name__, strategy_fn=fn) for fn in all_strategies[:6]]
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorizedEnvironment])
+def test_streamed_history_matches_in_memory(tmp_path, env_cls):
+    random.seed(0)
+    expected = env_cls(strategy_agents(), rounds=5, record="round")
+    expected.run()
+    random.seed(0)
+    streamed = env_cls(strategy_agents(), rounds=5, record="round", wealth_path=tmp_path / "w.npy")
+    streamed.run()
+    assert {name: list(wealth) for name, wealth in streamed.wealth_history.items()} == expected.wealth_history
+
+
+def test_duplicate_names_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        NpyWealthWriter(tmp_path / "w.npy", ["tit_for_tat", "grim", "tit_for_tat"])
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorizedEnvironment])
+def test_stream_is_closed_when_run_raises(tmp_path, env_cls):
+    class Failing(env_cls):
+        def after_round(self, round_index, offsets=None):
+            super().after_round(round_index, offsets)
+            if round_index == 2:
+                raise RuntimeError("stop")
+
+    path = tmp_path / "w.npy"
+    env = Failing(strategy_agents(), rounds=5, record="round", wealth_path=path)
+    with pytest.raises(RuntimeError):
+        env.run()
+    assert env.wealth_history.file.closed
+    # The rows recorded before the failure are readable
+    assert len(np.load(path)) == 3
+    assert len(load_wealth_history(path)["tit_for_tat"]) == 3
@@ -0,0 +1,157 @@
+import random
+from abc import ABC, abstractmethod
+import numpy as np
+
+
+class Topology(ABC):
+    """Who plays whom each round in an Environment.
+
+    pairs(round_index) returns the (i, j) agent index pairs, i < j, played
+    that round in order; pairs_per_round is their count (used to size the
+    wealth history).
+    """
+    n = 0
+
+    @abstractmethod
+    def pairs(self, round_index):
+        ...
+
+    @property
+    @abstractmethod
+    def pairs_per_round(self):
+        ...
+
+
+class CSRTopology(Topology):
+    """Static undirected graph in CSR form, played every round.
+
+    Only the upper triangle is stored: indices[indptr[i]:indptr[i + 1]] are
+    the neighbours j > i of agent i, sorted, so a round visits each edge
+    once in the same (i, j) order as Environment's round-robin.
+    """
+    def __init__(self, n, indptr, indices):
+        self.n = n
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        sources = np.repeat(np.arange(n), np.diff(self.indptr))
+        self._pairs = list(zip(sources.tolist(), self.indices.tolist()))
+
+    @classmethod
+    def from_edges(cls, n, edges):
+        """Build from any iterable of undirected (i, j) edges; duplicates and self-loops are dropped."""
+        edges = np.asarray(list(edges), dtype=np.int64).reshape(-1, 2)
+        lo = np.minimum(edges[:, 0], edges[:, 1])
+        hi = np.maximum(edges[:, 0], edges[:, 1])
+        keep = lo != hi
+        keys = np.unique(lo[keep] * n + hi[keep])
+        lo, hi = keys // n, keys % n
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(lo, minlength=n), out=indptr[1:])
+        return cls(n, indptr, hi)
+
+    def neighbours(self, i):
+        """Neighbours j > i of agent i."""
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def degrees(self):
+        """Full (both directions) degree of every agent."""
+        return np.diff(self.indptr) + np.bincount(self.indices, minlength=self.n)
+
+    def pairs(self, round_index):
+        return self._pairs
+
+    @property
+    def pairs_per_round(self):
+        return len(self._pairs)
+
+
+def complete(n):
+    """Every i < j pair: the round-robin Environment plays without a topology."""
+    return CSRTopology.from_edges(n, ((i, j) for i in range(n) for j in range(i + 1, n)))
+
+
+def ring_lattice(n, k):
+    """Each agent linked to its k // 2 nearest neighbours on either side of a ring."""
+    half = k // 2
+    i = np.repeat(np.arange(n), half)
+    j = (i + np.tile(np.arange(1, half + 1), n)) % n
+    return CSRTopology.from_edges(n, np.stack([i, j], axis=1))
+
+
+def small_world(n, k, p, seed=None):
+    """Watts-Strogatz graph: a ring lattice whose edges are rewired with probability p."""
+    rng = random.Random(seed)
+    half = k // 2
+    edges = set()
+    for i in range(n):
+        for d in range(1, half + 1):
+            edges.add((i, (i + d) % n))
+    adjacency = {i: set() for i in range(n)}
+    for i, j in edges:
+        adjacency[i].add(j)
+        adjacency[j].add(i)
+    for i, j in sorted(edges):
+        if rng.random() >= p or len(adjacency[i]) >= n - 1:
+            continue
+        new = rng.randrange(n)
+        while new == i or new in adjacency[i]:
+            new = rng.randrange(n)
+        adjacency[i].discard(j)
+        adjacency[j].discard(i)
+        adjacency[i].add(new)
+        adjacency[new].add(i)
+    return CSRTopology.from_edges(n, ((i, j) for i in adjacency for j in adjacency[i] if i < j))
+
+
+def random_regular(n, k, seed=None, max_tries=100):
+    """Random k-regular graph (n * k must be even), by stub matching with restarts."""
+    if (n * k) % 2 or k >= n:
+        raise ValueError("random_regular needs n * k even and k < n")
+    rng = random.Random(seed)
+    for _ in range(max_tries):
+        edges = set()
+        stubs = [i for i in range(n) for _ in range(k)]
+        while stubs:
+            # Pair up the stubs at random; clashing pairs go back into the pool
+            rng.shuffle(stubs)
+            leftover = []
+            for a, b in zip(stubs[::2], stubs[1::2]):
+                edge = (min(a, b), max(a, b))
+                if a == b or edge in edges:
+                    leftover.extend((a, b))
+                else:
+                    edges.add(edge)
+            if len(leftover) == len(stubs):
+                break  # stuck: only bad pairings remain
+            stubs = leftover
+        if not stubs:
+            return CSRTopology.from_edges(n, edges)
+    raise RuntimeError(f"no {k}-regular graph on {n} nodes found in {max_tries} tries")
+
+
+class RandomMatching(Topology):
+    """A fresh random perfect matching every round (one agent sits out if n is odd).
+
+    Uses its own RNG, so the strategies' draws from `random` are unaffected.
+    """
+    def __init__(self, n, seed=None):
+        self.n = n
+        self.rng = random.Random(seed)
+
+    def pairs(self, round_index):
+        order = list(range(self.n))
+        self.rng.shuffle(order)
+        return [(a, b) if a < b else (b, a) for a, b in zip(order[::2], order[1::2])]
+
+    @property
+    def pairs_per_round(self):
+        return self.n // 2
+
+
+TOPOLOGIES = {
+    "complete": complete,
+    "lattice": ring_lattice,
+    "small_world": small_world,
+    "regular": random_regular,
+    "matching": RandomMatching,
+}
@@ -1,9 +1,13 @@
 from phase_3_mcts_simulation import build_rl_agents, Phase3Simulator
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
+import hashlib
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from GameSetup import Agent
+from Monte_Carlo import MCTS, MCTSWithLearningModel
+from match_cache import MatchCache, source_hash, strategy_fingerprint
+from worker_pool import derive_seed, init_worker
 from strategies.deceptive_strategies import all_strategies as deceptive_strategies
 from strategies.deterministic_strategies import all_strategies as deterministic_strategies
 from strategies.evolutionary_strategies import all_strategies as evolutionary_strategies
@@ -11,48 +15,154 @@ from strategies.group_aware_strategies import all_strategies as group_aware_stra
 from strategies.probing_strategies import all_strategies as probing_strategies
 from strategies.stochastic_strategies import all_strategies as stochastic_strategies
 
+MODEL_NAMES = {1: "PersonalTrust", 2: "TRAVOSTrust", 3: "HearsayTrust",
+               4: "DefectiveAgent", 5: "AdversaryAgent"}
+
+# Gather ALL strategies from all categories
+ALL_OPPONENTS = (
+    deceptive_strategies + deterministic_strategies + evolutionary_strategies
+    + group_aware_strategies + probing_strategies + stochastic_strategies
+)
+
+
+def match_rows(trust_model, strategy_fn, seed, num_episodes=5, max_rounds=3):
+    """Play one RL trust variant against one opponent strategy with its own seed.
+
+    Returns one result dict per episode, tagged with opponent and rl_variant.
+    """
+    random.seed(seed)
+    a1, mcts1, a2, mcts2 = build_rl_agents(trust_model=trust_model)
+    opp_name = strategy_fn.__name__
+    opponent = Agent(opp_name, strategy_fn=strategy_fn)
+
+    sim = Phase3Simulator(a1, opponent, mcts1, mcts2, num_episodes=num_episodes, max_rounds=max_rounds)
+    rows = list(sim.iter_results())
+    for row in rows:
+        row["opponent"] = opp_name
+        row["rl_variant"] = f"RL + {MODEL_NAMES[trust_model]}"
+    return rows
+
+
+def run_match(trust_model, strategy_fn, seed, num_episodes=5, max_rounds=3):
+    """match_rows as a DataFrame."""
+    import pandas as pd
+    return pd.DataFrame(match_rows(trust_model, strategy_fn, seed, num_episodes, max_rounds))
+
+
+def profiled_match_rows(*args, **kwargs):
+    """match_rows under an Instrumentation; returns (rows, instrumentation snapshot)."""
+    from profiling import Instrumentation
+    with Instrumentation() as instrumentation:
+        rows = match_rows(*args, **kwargs)
+    return rows, instrumentation.snapshot()
+
+
+def rl_fingerprint(trust_model, weights="saved_models/trust_gnn.pth"):
+    """Cache identity of an RL variant: its model plus the code and weights behind its moves."""
+    digest = source_hash(match_rows, Phase3Simulator, build_rl_agents, MCTS, MCTSWithLearningModel, Agent)
+    if os.path.exists(weights):
+        with open(weights, "rb") as f:
+            digest += hashlib.sha256(f.read()).hexdigest()[:16]
+    return f"rl:{MODEL_NAMES[trust_model]}", digest
+
+
+def run_sweep(trust_models, opponents=ALL_OPPONENTS, replicates=1, workers=None, base_seed=0,
+              num_episodes=5, max_rounds=3, cache_path=None, sink=None, profile=None):
+    """Run every (trust_model, opponent, replicate) match across a process pool.
+
+    Each job gets a seed derived from its own coordinates, so the results are
+    the same whatever the worker count. They are collected as they complete
+    and released in job order: into sink (a ResultsSink), which is returned,
+    or into one DataFrame if no sink is given. With cache_path, matches
+    already in that MatchCache are loaded instead of played, and new ones
+    are stored there. With profile (a profiling.Instrumentation), the
+    matches are played instrumented and the workers' counters and trace
+    events are merged into it.
+    """
+    jobs = [
+        (trust_model, strategy_fn, derive_seed(base_seed, trust_model, strategy_fn.__name__, rep))
+        for trust_model in trust_models
+        for strategy_fn in opponents
+        for rep in range(replicates)
+    ]
+    results = [None] * len(jobs)
+    collected = []
+    next_idx = 0
+
+    def release():
+        # Hand finished matches over in job order; later ones wait for the gap to fill
+        nonlocal next_idx
+        while next_idx < len(jobs) and results[next_idx] is not None:
+            if sink is not None:
+                sink.extend(results[next_idx])
+                results[next_idx] = ()
+            else:
+                collected.extend(results[next_idx])
+            next_idx += 1
+
+    cache = MatchCache(cache_path) if cache_path is not None else None
+    params = f"episodes={num_episodes}"
+    keys = {}
+    if cache is not None:
+        for idx, (trust_model, strategy_fn, seed) in enumerate(jobs):
+            keys[idx] = (rl_fingerprint(trust_model), strategy_fingerprint(strategy_fn))
+            results[idx] = cache.get(*keys[idx], max_rounds, seed=seed, params=params)
+    pending = [idx for idx in range(len(jobs)) if results[idx] is None]
+    release()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        play = match_rows if profile is None else profiled_match_rows
+        futures = {
+            pool.submit(play, *jobs[idx], num_episodes=num_episodes, max_rounds=max_rounds): idx
+            for idx in pending
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            idx = futures[future]
+            results[idx] = future.result()
+            if profile is not None:
+                results[idx], snapshot = results[idx]
+                profile.merge(snapshot)
+            if cache is not None:
+                cache.put(*keys[idx], max_rounds, results[idx], seed=jobs[idx][2], params=params)
+            release()
+            print(f"[{done}/{len(pending)}] matches finished", end="\r")
+    print()
+    if cache is not None:
+        print(f"Match cache: {len(jobs) - len(pending)} of {len(jobs)} matches loaded from {cache_path}")
+        cache.close()
+    if sink is not None:
+        return sink
+    import pandas as pd
+    return pd.DataFrame(collected)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RL trust variants vs all opponent strategies")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--replicates", type=int, default=1, help="seeds per (trust model, opponent) pair")
+    parser.add_argument("--seed", type=int, default=0, help="base seed the per-match seeds derive from")
+    parser.add_argument("--cache", default=None, help="sqlite match cache to reuse finished matches from")
+    parser.add_argument("--profile", default=None, metavar="PREFIX",
+                        help="instrument the matches; print a phase summary and write PREFIX.trace.json/.pstats")
+    args = parser.parse_args()
+
+    from results_sink import ResultsSink
+    profile = None
+    if args.profile:
+        from profiling import Instrumentation
+        profile = Instrumentation()
     trust_rl_strategies = [1, 2, 3, 4, 5]  # All trust models
-    all_results = []
-
-    for trust_model in trust_rl_strategies:
-        a1, mcts1, a2, mcts2 = build_rl_agents(trust_model=trust_model)
-        model_name = {1: "PersonalTrust", 2: "TRAVOSTrust", 3: "HearsayTrust",
-                      4: "DefectiveAgent", 5: "AdversaryAgent"}[trust_model]
-        rl_label = f"RL + {model_name}"
-
-        # Gather ALL strategies from all categories
-        all_strategy_sets = [
-            deceptive_strategies, deterministic_strategies, evolutionary_strategies,
-            group_aware_strategies, probing_strategies, stochastic_strategies
-        ]
-        opponents = []
-        for strategy_set in all_strategy_sets:
-            for strategy_fn in strategy_set:
-                name = strategy_fn.__name__
-                opponents.append((Agent(name, strategy_fn=strategy_fn), name))
-
-        # Shuffle for randomness/variability
-        random.shuffle(opponents)
-
-        for opponent, opp_name in opponents:
-            # Add variability by changing random seed each match
-            random.seed(hash(f"{trust_model}-{opp_name}") % 1_000_000)
-
-            sim = Phase3Simulator(a1, opponent, mcts1, mcts2, num_episodes=5, max_rounds=3)
-            df = sim.run()
-            df["opponent"] = opp_name
-            df["rl_variant"] = rl_label
-            all_results.append(df)
-
-    if all_results:
-        full_df = pd.concat(all_results, ignore_index=True)
-        full_df.to_csv("phase3_vs_all_results.csv", index=False)
+    with ResultsSink("phase3_vs_all_results.csv") as sink:
+        run_sweep(trust_rl_strategies, replicates=args.replicates, workers=args.workers,
+                  base_seed=args.seed, cache_path=args.cache, sink=sink, profile=profile)
+    if profile is not None:
+        profile.dump(args.profile)
+
+    if len(sink):
         print("Saved tournament results to phase3_vs_all_results.csv")
+        import matplotlib.pyplot as plt
+        import seaborn as sns
 
-        avg_wealth = (full_df[full_df.agent == "RLAgent1"]
-                      .groupby(["rl_variant", "opponent"])["total_wealth"].mean()
-                      .unstack().fillna(0))
+        avg_wealth = sink.aggregates.pivot("total_wealth")
         plt.figure(figsize=(16, 7))
         avg_wealth.T.plot(kind="bar")
         plt.title("RL Trust Variants vs Opponent Strategies (Wealth)")
@@ -63,11 +173,8 @@ if __name__ == "__main__":
         plt.savefig("rl_all_trust_barplot.png")
         print("Saved bar plot to rl_all_trust_barplot.png")
 
-        action_means = (full_df[full_df.agent == "RLAgent1"]
-                        .groupby(["rl_variant", "opponent"])[["num_cooperate", "num_defect", "num_abstain"]]
-                        .mean())
         for action in ["num_cooperate", "num_defect", "num_abstain"]:
-            pivot = action_means[action].unstack().fillna(0)
+            pivot = sink.aggregates.pivot(action)
             plt.figure(figsize=(14, 6))
             sns.heatmap(pivot, annot=True, cmap="YlGnBu")
             plt.title(f"{action.replace('num_', '').capitalize()} Heatmap: RL Variants vs Opponents")
@@ -0,0 +1,274 @@
+"""Trust-graph snapshots from real games, stored as a sharded on-disk dataset.
+
+Every logged round becomes one graph: a node per agent with the features
+  [trust, wealth, cooperate rate, defect rate, abstain rate]
+(trust is the agent's shared Beta reputation, rates are over its moves so
+far; the same slots MCTSWithLearningModel.leaf_features fills), an edge in
+both directions for each interaction that round, and a node label y of 1
+if the agent cooperated in at least half of its interactions in the next
+round, 0 if it did not, and -1 if it did not play (ignored in training).
+
+    python trace_dataset.py --out traces --seeds 4
+"""
+import argparse
+import json
+import os
+import random
+import numpy as np
+import torch
+from torch.utils.data import Dataset, Sampler
+from torch_geometric.data import Data
+from GameSetup import Agent, Environment
+
+FEATURES = ("trust", "wealth", "cooperate_rate", "defect_rate", "abstain_rate")
+MOVE_INDEX = {"C": 0, "D": 1, "A": 2}
+IGNORE_LABEL = -1
+
+
+def node_features(trust, wealth, counts):
+    """(N, 5) float32 features from per-agent trust, wealth and (C, D, A) move counts."""
+    counts = np.asarray(counts, dtype=np.float64)
+    played = np.maximum(counts.sum(axis=1, keepdims=True), 1)
+    return np.column_stack([trust, wealth, counts / played]).astype(np.float32)
+
+
+def next_round_labels(round_counts):
+    """Node labels from the (C, D, A) counts of the following round."""
+    played = round_counts.sum(axis=1)
+    labels = (2 * round_counts[:, 0] >= played).astype(np.int64)
+    labels[played == 0] = IGNORE_LABEL
+    return labels
+
+
+def undirected(pairs):
+    """(2, 2E) edge index with both directions of every (i, j) pair."""
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    return np.concatenate([pairs.T, pairs[:, ::-1].T], axis=1)
+
+
+class TracingEnvironment(Environment):
+    """Environment that logs each round as a trust-graph snapshot into writer.
+
+    A round's snapshot is written once the next round is played, since its
+    labels are that round's moves; the last round has none and is dropped.
+    """
+    def __init__(self, agents, writer, **kwargs):
+        super().__init__(agents, **kwargs)
+        self.writer = writer
+
+    def run(self):
+        n = len(self.agents)
+        self._index = {id(agent): i for i, agent in enumerate(self.agents)}
+        self._counts = np.zeros((n, 3), dtype=np.int64)
+        self._round_counts = np.zeros((n, 3), dtype=np.int64)
+        self._pairs = []
+        self._pending = None
+        super().run()
+        self._pending = None
+
+    def play_round(self, agent1, agent2):
+        action1, action2 = super().play_round(agent1, agent2)
+        i, j = self._index[id(agent1)], self._index[id(agent2)]
+        self._round_counts[i, MOVE_INDEX[action1]] += 1
+        self._round_counts[j, MOVE_INDEX[action2]] += 1
+        self._pairs.append((i, j))
+        return action1, action2
+
+    def after_round(self, round_index, offsets=None):
+        super().after_round(round_index, offsets)
+        if self._pending is not None:
+            x, edge_index = self._pending
+            self.writer.add(x, edge_index, next_round_labels(self._round_counts))
+        self._counts += self._round_counts
+        trust = [self.reputation.get(agent.name, 0.5) for agent in self.agents]
+        wealth = [agent.wealth for agent in self.agents]
+        self._pending = (node_features(trust, wealth, self._counts), undirected(self._pairs))
+        self._round_counts[:] = 0
+        self._pairs = []
+
+
+def record_phase3(sim, writer):
+    """Run a Phase3Simulator, logging every round but the last of each episode; returns its rows.
+
+    The two players are the nodes. Their reputation is the Beta expected
+    value of their cooperation so far and their wealth is replayed from the
+    episode's payoffs.
+    """
+    rows = []
+    edge_index = undirected([(0, 1)])
+    for row in sim.iter_results():
+        rows.append(row)
+        moves = (list(sim.agent1.history), list(sim.agent2.history))
+        payoffs = [sim.get_payoff(a1, a2) for a1, a2 in zip(*moves)]
+        wealth = np.array([sim.agent1.wealth, sim.agent2.wealth], dtype=np.float64)
+        wealth -= np.sum(payoffs, axis=0) if payoffs else 0
+        counts = np.zeros((2, 3), dtype=np.int64)
+        for r in range(len(payoffs) - 1):
+            codes = [MOVE_INDEX[m[r]] for m in moves]
+            counts[[0, 1], codes] += 1
+            wealth += payoffs[r]
+            trust = (counts[:, 0] + 1) / (counts[:, 0] + counts[:, 1] + 2)
+            following = np.zeros((2, 3), dtype=np.int64)
+            following[[0, 1], [MOVE_INDEX[m[r + 1]] for m in moves]] = 1
+            writer.add(node_features(trust, wealth, counts), edge_index, next_round_labels(following))
+    return rows
+
+
+class ShardWriter:
+    """Append-only writer of graph snapshots into fixed-size shard files.
+
+    Graphs are buffered and written shard_size at a time as one .pt file of
+    concatenated tensors (x, edge_index, y plus node/edge offsets), listed
+    with their graph counts in manifest.json. Writing into a directory that
+    already holds a dataset appends new shards to it.
+    """
+    def __init__(self, directory, shard_size=4096):
+        self.directory = directory
+        self.shard_size = shard_size
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = load_manifest(directory) or {"features": list(FEATURES), "shards": []}
+        self.buffer = []
+        self.graphs = 0
+
+    def add(self, x, edge_index, y):
+        self.buffer.append((x, edge_index, y))
+        self.graphs += 1
+        if len(self.buffer) >= self.shard_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        xs, edges, ys = zip(*self.buffer)
+        node_ptr = np.concatenate([[0], np.cumsum([len(x) for x in xs])])
+        edge_ptr = np.concatenate([[0], np.cumsum([e.shape[1] for e in edges])])
+        name = f"shard-{len(self.manifest['shards']):05d}.pt"
+        torch.save({
+            "x": torch.from_numpy(np.concatenate(xs)),
+            "edge_index": torch.from_numpy(np.concatenate(edges, axis=1)),
+            "y": torch.from_numpy(np.concatenate(ys)),
+            "node_ptr": torch.from_numpy(node_ptr),
+            "edge_ptr": torch.from_numpy(edge_ptr),
+        }, os.path.join(self.directory, name))
+        self.manifest["shards"].append({"file": name, "graphs": len(self.buffer)})
+        self.buffer = []
+        with open(os.path.join(self.directory, "manifest.json"), "w") as f:
+            json.dump(self.manifest, f, indent=2)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_manifest(directory):
+    path = os.path.join(directory, "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+class TraceDataset(Dataset):
+    """Graphs of a ShardWriter directory, one torch_geometric Data per index.
+
+    Shards are loaded on demand and the most recent one is kept, so reading
+    in ShardSampler order loads each shard once per epoch (per DataLoader
+    worker).
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        manifest = load_manifest(directory)
+        if manifest is None:
+            raise FileNotFoundError(f"no manifest.json in {directory}")
+        self.files = [shard["file"] for shard in manifest["shards"]]
+        self.offsets = np.concatenate([[0], np.cumsum([shard["graphs"] for shard in manifest["shards"]])])
+        self._shard_id = None
+        self._shard = None
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def shard_ranges(self):
+        """(start, stop) dataset indices of each shard."""
+        return list(zip(self.offsets[:-1].tolist(), self.offsets[1:].tolist()))
+
+    def _load(self, shard_id):
+        if shard_id != self._shard_id:
+            path = os.path.join(self.directory, self.files[shard_id])
+            self._shard = torch.load(path, weights_only=True)
+            self._shard_id = shard_id
+        return self._shard
+
+    def __getitem__(self, idx):
+        shard_id = int(np.searchsorted(self.offsets, idx, side="right")) - 1
+        shard = self._load(shard_id)
+        k = idx - int(self.offsets[shard_id])
+        n0, n1 = shard["node_ptr"][k], shard["node_ptr"][k + 1]
+        e0, e1 = shard["edge_ptr"][k], shard["edge_ptr"][k + 1]
+        return Data(x=shard["x"][n0:n1], edge_index=shard["edge_index"][:, e0:e1], y=shard["y"][n0:n1])
+
+
+class ShardSampler(Sampler):
+    """Shuffles the shard order and the graphs within each shard, but never mixes shards.
+
+    Keeps TraceDataset's one-shard cache effective while still giving each
+    epoch a different order.
+    """
+    def __init__(self, dataset, seed=0):
+        self.ranges = dataset.shard_ranges()
+        self.seed = seed
+        self.epoch = 0
+
+    def __iter__(self):
+        rng = random.Random(self.seed + self.epoch)
+        self.epoch += 1
+        order = list(range(len(self.ranges)))
+        rng.shuffle(order)
+        for shard_id in order:
+            indices = list(range(*self.ranges[shard_id]))
+            rng.shuffle(indices)
+            yield from indices
+
+    def __len__(self):
+        return sum(stop - start for start, stop in self.ranges)
+
+
+def record(out, seeds=1, rounds=25, shard_size=4096, phase3=True, num_episodes=5, max_rounds=10):
+    """Log the all-strategies tournament (and optionally the Phase 3 RL matches) under each seed."""
+    from tournament_runner import ALL_OPPONENTS
+    from phase_3_mcts_simulation import build_rl_agents, Phase3Simulator
+    trust_models = {"PersonalTrust": 1, "TRAVOSTrust": 2, "HearsayTrust": 3,
+                    "DefectiveAgent": 4, "AdversaryAgent": 5}
+    with ShardWriter(out, shard_size) as writer:
+        for seed in range(seeds):
+            random.seed(seed)
+            agents = [Agent(name, trust_model=model) for name, model in trust_models.items()]
+            agents += [Agent(fn.__name__, strategy_fn=fn) for fn in ALL_OPPONENTS]
+            TracingEnvironment(agents, writer, rounds=rounds, record="end").run()
+            if not phase3:
+                continue
+            for model in trust_models.values():
+                for fn in ALL_OPPONENTS:
+                    a1, mcts1, a2, mcts2 = build_rl_agents(trust_model=model)
+                    sim = Phase3Simulator(a1, Agent(fn.__name__, strategy_fn=fn), mcts1, mcts2,
+                                          num_episodes=num_episodes, max_rounds=max_rounds)
+                    record_phase3(sim, writer)
+            print(f"seed {seed}: {writer.graphs} graphs so far")
+    return writer.graphs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record tournament traces as a sharded trust-graph dataset")
+    parser.add_argument("--out", default="traces", help="dataset directory (appended to if it exists)")
+    parser.add_argument("--seeds", type=int, default=1, help="tournaments to record, one per seed")
+    parser.add_argument("--rounds", type=int, default=25, help="rounds per all-strategies tournament")
+    parser.add_argument("--shard-size", type=int, default=4096, help="graphs per shard file")
+    parser.add_argument("--no-phase3", action="store_true", help="skip the Phase 3 RL-vs-strategy matches")
+    args = parser.parse_args()
+    graphs = record(args.out, args.seeds, args.rounds, args.shard_size, phase3=not args.no_phase3)
+    print(f"Saved {graphs} graphs to {args.out}/")
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    """LRU cache of MCTS state evaluations with hit/miss counters.
+
+    Keys are built with history_key() so identical states reached along
+    different paths, in different simulations or by different MCTS
+    instances (see shared_table) map to the same entry.
+    """
+    def __init__(self, max_size=100_000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        value = self.entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries), "max_size": self.max_size,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_MISSING = object()
+_shared = None
+
+
+def shared_table(max_size=100_000):
+    """Process-wide table for MCTS instances created with transposition_table=True."""
+    global _shared
+    if _shared is None:
+        _shared = TranspositionTable(max_size)
+    return _shared
+
+
+def history_key(history):
+    """Compact, hashable encoding of a [(agent1 move, agent2 move), ...] history."""
+    return "".join(a + b for a, b in history)
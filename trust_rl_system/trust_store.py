@@ -0,0 +1,269 @@
+from collections.abc import MutableMapping
+import numpy as np
+from GameSetup import COOPERATE, DEFECT, ABSTAIN, BELIEF_LIKELIHOODS
+
+# Order of the three opponent types in a belief vector
+BELIEF_TYPES = ("C", "L", "A")
+UNIFORM_BELIEF = np.full(3, 1 / 3)
+# Move codes, as vectorized_tournament.ACTION_CODES
+ACTION_INDEX = {COOPERATE: 0, DEFECT: 1, ABSTAIN: 2}
+# LIKELIHOODS[action code, type]: GameSetup.BELIEF_LIKELIHOODS as an array
+LIKELIHOODS = np.array([[BELIEF_LIKELIHOODS[t][action] for t in BELIEF_TYPES] for action in ACTION_INDEX])
+
+
+class TrustStore:
+    """Trust, evidence and beliefs of a whole population in N x N arrays.
+
+    Row i holds what agent i thinks of every other agent, indexed by
+    integer agent ids. Columns past the agents are for extra_names: others
+    the agents already hold opinions about (e.g. from an earlier
+    tournament), so no existing entry is lost.
+      trust[i, j]        trust level, NaN until i first observes j
+      success/fail[i, j] Beta evidence counts, meaningful where seen[i, j]
+      beliefs[i, j]      (C, L, A) type distribution, meaningful where has_beliefs[i, j]
+
+    Attached agents expose their rows through dict-like views (Agent.trust,
+    Agent.evidence, Agent.beliefs) and update them in place; observe_batch
+    applies a whole batch of observations with array operations.
+    """
+    def __init__(self, names, extra_names=()):
+        self.names = list(names)
+        n = len(self.names)
+        self.names += [name for name in dict.fromkeys(extra_names) if name not in set(self.names)]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        m = len(self.names)
+        self.trust = np.full((n, m), np.nan)
+        self.success = np.zeros((n, m), dtype=np.int64)
+        self.fail = np.zeros((n, m), dtype=np.int64)
+        self.seen = np.zeros((n, m), dtype=bool)
+        self.beliefs = np.zeros((n, m, 3))
+        self.has_beliefs = np.zeros((n, m), dtype=bool)
+
+    @classmethod
+    def attach(cls, agents):
+        """A store for agents, seeded with their current dicts; each agent then reads and writes it."""
+        state = [(dict(agent.trust), {k: dict(v) for k, v in agent.evidence.items()},
+                  {k: dict(v) for k, v in agent.beliefs.items()}) for agent in agents]
+        known = [name for trust, evidence, beliefs in state for d in (trust, evidence, beliefs) for name in d]
+        store = cls([agent.name for agent in agents], known)
+        for i, (agent, (trust, evidence, beliefs)) in enumerate(zip(agents, state)):
+            agent.attach_store(store, i)
+            agent.trust = trust
+            agent.evidence = evidence
+            agent.beliefs = beliefs
+        return store
+
+    def update_trust(self, row, opponent_name, action, reputation=None):
+        """Agent.update_trust for the agent at row."""
+        col = self.index[opponent_name]
+        first = not self.seen[row, col]
+        self.seen[row, col] = True
+        if action == "C":
+            self.success[row, col] += 1
+        elif action == "D":
+            self.fail[row, col] += 1
+        if reputation is not None and (first or action != "A"):
+            reputation.record(self.names[row], opponent_name, int(self.success[row, col]), int(self.fail[row, col]))
+        trust = self.trust[row, col]
+        if np.isnan(trust):
+            trust = 0.5
+        if action == "D":
+            trust -= 0.1
+        elif action == "C":
+            trust += 0.1
+        self.trust[row, col] = max(0, min(1, trust))
+
+    def update_beliefs(self, row, opponent_name, action):
+        """Agent.update_beliefs for the agent at row."""
+        col = self.index[opponent_name]
+        prior = self.beliefs[row, col] if self.has_beliefs[row, col] else UNIFORM_BELIEF
+        joint = LIKELIHOODS[ACTION_INDEX[action]] * prior
+        self.beliefs[row, col] = joint / (joint[0] + joint[1] + joint[2])
+        self.has_beliefs[row, col] = True
+
+    def observe_batch(self, observers, targets, actions, reputation=None):
+        """Apply update_trust and update_beliefs for many (observer, target, action) at once.
+
+        observers and targets are integer ids and actions move codes (0 = C,
+        1 = D, 2 = A; see vectorized_tournament.ACTION_CODES). Each
+        (observer, target) pair may appear at most once per batch. If a
+        SharedTrustTable is given, its records are made in batch order, as
+        the one-by-one updates would.
+        """
+        obs = np.asarray(observers, dtype=np.int64)
+        tgt = np.asarray(targets, dtype=np.int64)
+        act = np.asarray(actions, dtype=np.int64)
+        coop, defect = act == 0, act == 1
+
+        first = ~self.seen[obs, tgt]
+        old_success, old_fail = self.success[obs, tgt], self.fail[obs, tgt]
+        new_success = old_success + coop
+        new_fail = old_fail + defect
+        self.success[obs, tgt] = new_success
+        self.fail[obs, tgt] = new_fail
+        self.seen[obs, tgt] = True
+
+        trust = self.trust[obs, tgt]
+        trust = np.where(np.isnan(trust), 0.5, trust)
+        trust = np.where(defect, trust - 0.1, np.where(coop, trust + 0.1, trust))
+        self.trust[obs, tgt] = np.clip(trust, 0, 1)
+
+        prior = np.where(self.has_beliefs[obs, tgt][:, None], self.beliefs[obs, tgt], UNIFORM_BELIEF)
+        joint = LIKELIHOODS[act] * prior
+        marginal = joint[:, 0] + joint[:, 1] + joint[:, 2]
+        self.beliefs[obs, tgt] = joint / marginal[:, None]
+        self.has_beliefs[obs, tgt] = True
+
+        if reputation is not None:
+            names = self.names
+            for k in np.flatnonzero(first | (act != 2)).tolist():
+                reputation.record(names[obs[k]], names[tgt[k]], int(new_success[k]), int(new_fail[k]))
+
+
+class _StoreRow(MutableMapping):
+    """Dict-like view of one agent's row of a TrustStore, keyed by opponent name."""
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def _col(self, name):
+        col = self.store.index.get(name)
+        if col is None:
+            raise KeyError(name)
+        return col
+
+    def __contains__(self, name):
+        col = self.store.index.get(name)
+        return col is not None and self._present(col)
+
+    def get(self, name, default=None):
+        col = self.store.index.get(name)
+        if col is None or not self._present(col):
+            return default
+        return self._value(col)
+
+    def __getitem__(self, name):
+        col = self._col(name)
+        if not self._present(col):
+            raise KeyError(name)
+        return self._value(col)
+
+    def __iter__(self):
+        names = self.store.names
+        return iter([names[c] for c in np.flatnonzero(self._mask()).tolist()])
+
+    def __len__(self):
+        return int(np.count_nonzero(self._mask()))
+
+    def clear(self):
+        self._clear_row()
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class TrustView(_StoreRow):
+    """Agent.trust backed by TrustStore.trust."""
+    def _present(self, col):
+        return not np.isnan(self.store.trust[self.row, col])
+
+    def _mask(self):
+        return ~np.isnan(self.store.trust[self.row])
+
+    def _value(self, col):
+        return float(self.store.trust[self.row, col])
+
+    def __setitem__(self, name, value):
+        self.store.trust[self.row, self._col(name)] = value
+
+    def __delitem__(self, name):
+        self.store.trust[self.row, self._col(name)] = np.nan
+
+    def _clear_row(self):
+        self.store.trust[self.row] = np.nan
+
+
+class _Cell(MutableMapping):
+    """Dict-like view of one (row, col) cell spread over several store arrays."""
+    def __init__(self, arrays, row, col):
+        self.arrays = arrays
+        self.row = row
+        self.col = col
+
+    def __getitem__(self, key):
+        array, k = self.arrays[key]
+        value = array[self.row, self.col] if k is None else array[self.row, self.col, k]
+        return value.item()
+
+    def __setitem__(self, key, value):
+        array, k = self.arrays[key]
+        if k is None:
+            array[self.row, self.col] = value
+        else:
+            array[self.row, self.col, k] = value
+
+    def __delitem__(self, key):
+        raise TypeError("store cells have fixed keys")
+
+    def __iter__(self):
+        return iter(self.arrays)
+
+    def __len__(self):
+        return len(self.arrays)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class EvidenceView(_StoreRow):
+    """Agent.evidence backed by TrustStore.success/fail; values are {"success", "fail"} cells."""
+    def _present(self, col):
+        return self.store.seen[self.row, col]
+
+    def _mask(self):
+        return self.store.seen[self.row]
+
+    def _value(self, col):
+        store = self.store
+        return _Cell({"success": (store.success, None), "fail": (store.fail, None)}, self.row, col)
+
+    def __setitem__(self, name, value):
+        col = self._col(name)
+        self.store.success[self.row, col] = value["success"]
+        self.store.fail[self.row, col] = value["fail"]
+        self.store.seen[self.row, col] = True
+
+    def __delitem__(self, name):
+        col = self._col(name)
+        self.store.seen[self.row, col] = False
+        self.store.success[self.row, col] = 0
+        self.store.fail[self.row, col] = 0
+
+    def _clear_row(self):
+        self.store.seen[self.row] = False
+        self.store.success[self.row] = 0
+        self.store.fail[self.row] = 0
+
+
+class BeliefView(_StoreRow):
+    """Agent.beliefs backed by TrustStore.beliefs; values are {"C", "L", "A"} cells."""
+    def _present(self, col):
+        return self.store.has_beliefs[self.row, col]
+
+    def _mask(self):
+        return self.store.has_beliefs[self.row]
+
+    def _value(self, col):
+        beliefs = self.store.beliefs
+        return _Cell({t: (beliefs, k) for k, t in enumerate(BELIEF_TYPES)}, self.row, col)
+
+    def __setitem__(self, name, value):
+        col = self._col(name)
+        self.store.beliefs[self.row, col] = [value[t] for t in BELIEF_TYPES]
+        self.store.has_beliefs[self.row, col] = True
+
+    def __delitem__(self, name):
+        self.store.has_beliefs[self.row, self._col(name)] = False
+
+    def _clear_row(self):
+        self.store.has_beliefs[self.row] = False
@@ -0,0 +1,220 @@
+from functools import lru_cache
+import numpy as np
+from GameSetup import Environment, COOPERATE, DEFECT, ABSTAIN, PAYOFFS, BELIEF_LIKELIHOODS
+from strategies.registry import is_deterministic
+
+# Actions encoded as small integers so a whole round can be indexed at once
+ACTIONS = (COOPERATE, DEFECT, ABSTAIN)
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+# Agent.update_beliefs' starting belief, as hashable (type, probability) pairs
+UNIFORM_BELIEF = (("C", 1/3), ("L", 1/3), ("A", 1/3))
+
+# PAYOFF_MATRIX[a1, a2] -> (agent1_payoff, agent2_payoff)
+PAYOFF_MATRIX = np.zeros((3, 3, 2), dtype=np.int64)
+for (a1, a2), payoff in PAYOFFS.items():
+    PAYOFF_MATRIX[ACTION_CODES[a1], ACTION_CODES[a2]] = payoff
+
+
+class VectorizedEnvironment(Environment):
+    """Round-robin tournament that batches pairs of deterministic strategy agents.
+
+    Environment.run never appends to Agent.history, so during a run every
+    strategy sees the histories it had at reset and a deterministic strategy
+    plays the same move against a given opponent every round. Those moves are
+    evaluated once per run and encoded as integers; each round then applies
+    the payoffs of every such pairing with one vectorized step. Pairs that
+    involve a trust agent or a stochastic strategy fall back to play_round in
+    the usual order, so final wealth and match_scores equal Environment.run.
+
+    Batched pairs are settled a whole round at a time, so the "interaction"
+    recording policy is treated as "round" here. Their trust, evidence and
+    belief updates are still applied (each round if a TRAVOS or Hearsay
+    agent reads shared trust, otherwise once after the last round), so
+    agents end with the same state as after Environment.run.
+    track_evidence=False skips them, and is only accepted for fields
+    without trust-model agents.
+
+    Scope: moves are evaluated once per pair rather than compiled into
+    per-strategy state-machine transition tables, which would only pay
+    off if histories grew during a run; run() raises if they ever do.
+    """
+    def __init__(self, agents, track_evidence=True, **kwargs):
+        if not track_evidence and any(agent.trust_model is not None for agent in agents):
+            raise ValueError("track_evidence=False would hide strategy agents' evidence from trust-model agents")
+        super().__init__(agents, **kwargs)
+        self.track_evidence = track_evidence
+
+    def run(self):
+        """Run a round-robin tournament for the specified number of rounds."""
+        if self.topology is not None:
+            # Sparse topologies already cost O(edges) per round; play them unbatched
+            return super().run()
+        for agent in self.agents:
+            agent.wealth = 0
+            agent.history = []
+        self.attach_reputation()
+        n = len(self.agents)
+        batched = [agent.strategy is not None and is_deterministic(agent.strategy) for agent in self.agents]
+        batched_agents = [agent for agent, is_batched in zip(self.agents, batched) if is_batched]
+        # Strategy agents' evidence only feeds shared trust, which trust models 2 and 3
+        # read mid-run; without them it can be replayed once, after the last round
+        replay_per_round = self.track_evidence and (
+            self.trust_store is not None or any(agent.trust_model in (2, 3) for agent in self.agents))
+
+        # Split the i<j pair order into runs of batched pairs and fallback pairs
+        segments = []
+        for i in range(n):
+            for j in range(i + 1, n):
+                is_batched = batched[i] and batched[j]
+                if not segments or segments[-1][0] != is_batched:
+                    segments.append((is_batched, []))
+                segments[-1][1].append((i, j))
+
+        compiled = [self._compile_segment(pairs) if is_batched else None
+                    for is_batched, pairs in segments]
+        wealth_delta = np.zeros(n, dtype=np.int64)
+        score_matrix = np.zeros((n, n), dtype=np.int64)
+        for seg in compiled:
+            if seg is not None:
+                wealth_delta += seg["wealth_delta"]
+                np.add.at(score_matrix, (seg["i"], seg["j"]), seg["payoff1"])
+                np.add.at(score_matrix, (seg["j"], seg["i"]), seg["payoff2"])
+
+        wealth = np.zeros(n, dtype=np.int64)
+        self.wealth_history = self._new_wealth_history(self.expected_records(0))
+        try:
+            for round_index in range(self.rounds):
+                for (is_batched, pairs), seg in zip(segments, compiled):
+                    if not is_batched:
+                        for i, j in pairs:
+                            self.play_round(self.agents[i], self.agents[j])
+                    elif replay_per_round:
+                        self._record_segment(seg)
+                # Each batched pair's moves were fixed by the histories at reset
+                if any(agent.history for agent in batched_agents):
+                    raise RuntimeError("a strategy agent's history changed during the run; "
+                                       "batched moves would no longer match Environment.run")
+                wealth += wealth_delta
+                self.after_round(round_index, wealth)
+            self.finish_recording(wealth)
+        finally:
+            self.close_wealth_stream()
+        if self.track_evidence and not replay_per_round:
+            for seg in compiled:
+                if seg is not None:
+                    self._replay_segment(seg, self.rounds)
+
+        for agent, w in zip(self.agents, wealth):
+            agent.wealth += int(w)
+        for seg in compiled:
+            if seg is None or not self.rounds:
+                continue
+            for i, j in zip(seg["i"], seg["j"]):
+                name_i, name_j = self.agents[i].name, self.agents[j].name
+                key1, key2 = (name_i, name_j), (name_j, name_i)
+                self.match_scores[key1] = self.match_scores.get(key1, 0) + int(score_matrix[i, j]) * self.rounds
+                self.match_scores[key2] = self.match_scores.get(key2, 0) + int(score_matrix[j, i]) * self.rounds
+
+    def expected_records(self, interactions_per_round):
+        if self.record == "interaction":
+            return self.rounds // self.record_every
+        return super().expected_records(interactions_per_round)
+
+    def after_round(self, round_index, offsets=None):
+        if self.record in ("interaction", "round") and (round_index + 1) % self.record_every == 0:
+            self.record_wealth(offsets)
+
+    def _compile_segment(self, pairs):
+        """Evaluate each batched pair's moves once and precompute its per-round payoffs."""
+        i = np.array([p[0] for p in pairs], dtype=np.int64)
+        j = np.array([p[1] for p in pairs], dtype=np.int64)
+        actions = np.array(
+            [(ACTION_CODES[self.agents[a].decide_action(self.agents[b], self.reputation)],
+              ACTION_CODES[self.agents[b].decide_action(self.agents[a], self.reputation)])
+             for a, b in pairs],
+            dtype=np.int8,
+        ).reshape(-1, 2)
+        payoffs = PAYOFF_MATRIX[actions[:, 0], actions[:, 1]]
+        n = len(self.agents)
+        wealth_delta = (np.bincount(i, weights=payoffs[:, 0], minlength=n)
+                        + np.bincount(j, weights=payoffs[:, 1], minlength=n)).astype(np.int64)
+        # Observations in play_round order (agent1 sees agent2, then agent2 sees agent1);
+        # an agent that abstained observes nothing
+        observers = np.stack([i, j], axis=1).ravel()
+        targets = np.stack([j, i], axis=1).ravel()
+        observed = np.stack([actions[:, 1], actions[:, 0]], axis=1).ravel()
+        watching = np.stack([actions[:, 0], actions[:, 1]], axis=1).ravel() != ACTION_CODES[ABSTAIN]
+        return {
+            "i": i, "j": j, "actions": actions,
+            "payoff1": payoffs[:, 0], "payoff2": payoffs[:, 1],
+            "wealth_delta": wealth_delta,
+            "observations": (observers[watching], targets[watching], observed[watching]),
+        }
+
+    def _record_segment(self, seg):
+        """Apply the trust and belief updates play_round would make for a batched segment."""
+        if self.trust_store is not None:
+            self.trust_store.observe_batch(*seg["observations"], reputation=self.reputation)
+            return
+        agents = self.agents
+        for i, j, (c1, c2) in zip(seg["i"], seg["j"], seg["actions"]):
+            agent1, agent2 = agents[i], agents[j]
+            action1, action2 = ACTIONS[c1], ACTIONS[c2]
+            if action1 != ABSTAIN:
+                agent1.update_trust(agent2.name, action2)
+                agent1.update_beliefs(agent2.name, action2)
+            if action2 != ABSTAIN:
+                agent2.update_trust(agent1.name, action1)
+                agent2.update_beliefs(agent1.name, action1)
+
+    def _replay_segment(self, seg, times):
+        """Apply `times` rounds of a batched segment's trust and belief updates at once.
+
+        Each (observer, target) cell then evolves on its own, so its updates
+        are applied back to back, with the same float operations
+        Agent.update_trust and Agent.update_beliefs make.
+        """
+        agents = self.agents
+        observers, targets, observed = (array.tolist() for array in seg["observations"])
+        for obs, tgt, code in zip(observers, targets, observed):
+            agent, name, action = agents[obs], agents[tgt].name, ACTIONS[code]
+            ev = agent.evidence.get(name)
+            if ev is None:
+                ev = agent.evidence[name] = {"success": 0, "fail": 0}
+            if action == COOPERATE:
+                ev["success"] += times
+            elif action == DEFECT:
+                ev["fail"] += times
+            self.reputation.record(agent.name, name, ev["success"], ev["fail"])
+            agent.trust[name] = _repeat_trust(agent.trust.get(name, 0.5), action, times)
+            belief = agent.beliefs.get(name)
+            belief = tuple(belief.items()) if belief is not None else UNIFORM_BELIEF
+            agent.beliefs[name] = dict(_repeat_belief(belief, action, times))
+
+
+# Most cells start from the same trust or belief and see the same move, so the
+# repeated updates are memoized
+
+@lru_cache(maxsize=None)
+def _repeat_trust(trust, action, times):
+    """trust after `times` Agent.update_trust steps observing action."""
+    step = 0.1 if action == COOPERATE else -0.1 if action == DEFECT else 0
+    for _ in range(times):
+        clipped = max(0, min(1, trust + step))
+        if clipped == trust:  # saturated (or abstained): no later step changes it
+            break
+        trust = clipped
+    return trust
+
+
+@lru_cache(maxsize=None)
+def _repeat_belief(belief, action, times):
+    """(type, probability) pairs after `times` Agent.update_beliefs steps observing action."""
+    for _ in range(times):
+        prior = dict(belief)
+        marginal = sum(BELIEF_LIKELIHOODS[t][action] * prior[t] for t in prior)
+        updated = tuple((t, (BELIEF_LIKELIHOODS[t][action] * prior[t]) / marginal) for t in prior)
+        if updated == belief:  # reached the fixed point
+            break
+        belief = updated
+    return belief
@@ -0,0 +1,106 @@
+from collections.abc import Mapping
+import numpy as np
+
+
+class WealthHistory(Mapping):
+    """Wealth trajectories of all agents in one preallocated 2-D int32 array.
+
+    Row t holds every agent's wealth at the t-th recording, so memory is one
+    int32 per agent per record instead of one Python int per list slot.
+    Indexing by agent name gives a read-only 1-D view of that agent's column,
+    which plot_wealth_over_time can draw like the list it used to get.
+    """
+    def __init__(self, names, capacity, dtype=np.int32):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.data = np.zeros((max(capacity, 1), len(self.names)), dtype=dtype)
+        self.length = 0
+
+    def append_row(self, values):
+        if self.length == len(self.data):
+            # Out of preallocated rows: grow geometrically
+            grown = np.zeros((2 * len(self.data), self.data.shape[1]), dtype=self.data.dtype)
+            grown[:self.length] = self.data
+            self.data = grown
+        self.data[self.length] = values
+        self.length += 1
+
+    def as_array(self):
+        """(records, agents) view of the rows written so far."""
+        return self.data[:self.length]
+
+    def __getitem__(self, name):
+        column = self.data[:self.length, self.index[name]]
+        column.flags.writeable = False
+        return column
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+
+class NpyWealthWriter:
+    """Append-only .npy file of wealth snapshots, one record per row.
+
+    The array has a structured dtype with one int32 field per agent, so the
+    file keeps the agent names and np.load(path, mmap_mode="r")[name] reads a
+    single trajectory without loading the rest. Rows are buffered in chunks
+    and the header's shape is patched in place when the writer is closed.
+    """
+    # Room for a row count of up to 16 digits in the fixed-size header
+    _MAX_ROWS = 10 ** 15
+
+    def __init__(self, path, names, chunk_rows=4096):
+        self.path = path
+        self.names = list(names)
+        duplicates = sorted({name for name in self.names if self.names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"agent names must be unique to name the record fields, got duplicates {duplicates}")
+        self.dtype = np.dtype([(name, np.int32) for name in self.names])
+        self.buffer = np.zeros(chunk_rows, dtype=self.dtype)
+        self.buffered = 0
+        self.length = 0
+        self.file = open(path, "wb")
+        # Write the header at its final size so close() can patch it in place
+        self._header_size = len(self._header(self._MAX_ROWS))
+        self.file.write(self._header(0, self._header_size))
+
+    def _header(self, rows, size=None):
+        header = repr({
+            "descr": np.lib.format.dtype_to_descr(self.dtype),
+            "fortran_order": False,
+            "shape": (rows,),
+        }).encode("latin1")
+        prefix = np.lib.format.MAGIC_PREFIX + bytes([2, 0])
+        if size is None:
+            # Pad so the data starts on a 64-byte boundary, as np.save does
+            size = -(-(len(prefix) + 4 + len(header) + 1) // 64) * 64
+        header = header.ljust(size - len(prefix) - 4 - 1) + b"\n"
+        return prefix + len(header).to_bytes(4, "little") + header
+
+    def append_row(self, values):
+        self.buffer[self.buffered] = tuple(values)
+        self.buffered += 1
+        self.length += 1
+        if self.buffered == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer[:self.buffered].tobytes())
+        self.buffered = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.seek(0)
+        self.file.write(self._header(self.length, self._header_size))
+        self.file.close()
+
+
+def load_wealth_history(path):
+    """Memory-mapped {agent name: trajectory} view of a file written by NpyWealthWriter."""
+    records = np.load(path, mmap_mode="r")
+    return {name: records[name] for name in records.dtype.names}
@@ -0,0 +1,17 @@
+"""Helpers shared by the process pools of tournament_runner and parallel_mcts."""
+import hashlib
+
+
+def derive_seed(*parts):
+    """Stable 32-bit seed from the given parts (built-in hash() of a str changes between processes)."""
+    key = "-".join(str(part) for part in parts).encode()
+    return int.from_bytes(hashlib.sha256(key).digest()[:4], "little")
+
+
+def init_worker():
+    # One torch thread per process, otherwise the workers oversubscribe the cores
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass